@@ -0,0 +1,105 @@
+"""
+Compares memory used by `doc_generator.store` when entries are kept as nested dictionaries
+(the old representation) and when they are kept as `drftest.doc_entry.DocEntry` records.
+
+Usage: python benchmarks/store_memory.py [number_of_entries]
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'drftest.tests.test_settings')
+
+from drftest.doc_entry import DocEntry, DocMeta, DocResponse  # noqa: E402
+
+REQUESTS_PER_TEST = 4
+TESTS_PER_CLASS = 10
+
+
+def _make_test_names(count):
+    tests = range(count // REQUESTS_PER_TEST + 1)
+    return [('Docstring of test number {}'.format(test),
+             'test_number_{}'.format(test),
+             'ThingsViewTest{}'.format(test // TESTS_PER_CLASS)) for test in tests]
+
+
+# Like docstrings and names of real tests, these strings are created once and then shared by
+# every request of a test, so neither representation pays for copying them.
+_test_names = []
+
+
+def _fields(i):
+    docs, method_name, class_name = _test_names[i // REQUESTS_PER_TEST]
+    return {
+        'method': 'post',
+        'url': '/api/things/',
+        'docs': docs,
+        'method_name': method_name,
+        'class_name': class_name,
+        'app_name': 'things',
+    }
+
+
+def as_dict(i):
+    fields = _fields(i)
+    return {
+        'method': fields['method'],
+        'data': None,
+        'url': fields['url'],
+        'url_kwargs': None,
+        'format': 'json',
+        'headers': {},
+        'success': True,
+        'meta': {
+            'docs': fields['docs'],
+            'method_name': fields['method_name'],
+            'class_name': fields['class_name'],
+            'app_name': fields['app_name'],
+        },
+        'response': {
+            'data': None,
+            'content_type': 'application/json',
+            'status': 200,
+        },
+    }
+
+
+def as_record(i):
+    fields = _fields(i)
+    return DocEntry(
+        method=fields['method'],
+        data=None,
+        url=fields['url'],
+        url_kwargs=None,
+        format='json',
+        headers={},
+        success=True,
+        meta=DocMeta.get(fields['docs'], fields['method_name'], fields['class_name'],
+                         fields['app_name']),
+        response=DocResponse(data=None, content_type='application/json', status=200),
+    )
+
+
+def measure(factory, count):
+    tracemalloc.start()
+    store = [factory(i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    return size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    _test_names.extend(_make_test_names(count))
+    dict_size = measure(as_dict, count)
+    record_size = measure(as_record, count)
+    print('entries: {}'.format(count))
+    print('dict:    {:>12,} bytes ({:.0f} per entry)'.format(dict_size, dict_size / count))
+    print('record:  {:>12,} bytes ({:.0f} per entry)'.format(record_size, record_size / count))
+    print('saved:   {:.0%}'.format(1 - record_size / dict_size))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,35 +1,133 @@
 import importlib
 import json
 import logging
+import time
 import traceback
 from abc import abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
 
 import xlrd
 from django.conf import settings
+from django.dispatch import receiver
+from django.test.signals import setting_changed
 from django.urls import resolve
 from rest_framework import status
 from rest_framework.test import APITestCase, APIRequestFactory, APIClient
 
-from drftest import doc_generator
+from drftest import (
+    cassette, doc_generator, doc_writer, memory_tracker, phase_timer, response_profiler
+)
 from drftest.abc_test_meta import ABCTestMeta
 from drftest.auth_provider import AuthProvider
+from drftest.cassette import Cassette
+from drftest.doc_entry import DocEntry, DocMeta, DocResponse
 from drftest.uuid_encoder import UUIDEncoder
 
 ABCTestMeta.add_ignored_test_class_name('BaseViewTest')
 
+"""
+url_caches maps each test class to an `OrderedDict` of urls it has already reversed, keyed by
+url kwargs. It is only used by classes which set `url_cache_size`.
+"""
+url_caches = {}
+
+
+@receiver(setting_changed)
+def _clear_url_caches(setting, **kwargs):
+    if setting == 'ROOT_URLCONF':
+        url_caches.clear()
+
 
 class BaseViewTest(APITestCase, metaclass=ABCTestMeta):
     XLSX_RESPONSE_CONTENT_TYPE = \
         'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     auth_provider_class = None
+    url_cache_size = 0
+    track_memory = False
+    _cassette = None
+    _memory_snapshot = None
+    _pending_requests = None
+    _phase_timer = None
     current_test_name = None
     current_test_doc = None
 
+    @classmethod
+    def setUpClass(cls):
+        started = time.perf_counter()
+        super(BaseViewTest, cls).setUpClass()
+        app_name = cls.__module__.split('.')[0]
+        if phase_timer.is_enabled():
+            phase_timer.record_class(app_name, cls.__name__, phase_timer.CLASS_SETUP, started)
+        doc_writer.class_started(app_name)
+
+    @classmethod
+    def tearDownClass(cls):
+        started = time.perf_counter()
+        super(BaseViewTest, cls).tearDownClass()
+        if phase_timer.is_enabled():
+            phase_timer.record_class(cls.__module__.split('.')[0], cls.__name__,
+                                     phase_timer.CLASS_TEARDOWN, started)
+
     def setUp(self):
         super(BaseViewTest, self).setUp()
         self.api_client = APIClient()
         self.request_factory = APIRequestFactory()
 
+    def _tracks_memory(self):
+        """
+        If `track_memory` is set on the class or `DRF_TEST_TRACK_MEMORY` is set in settings,
+        memory allocated and not freed by each request and each test is recorded and the top
+        offenders are reported after all tests are run. Docs of such tests keep a copy of the
+        data they hold (see `memory_tracker.detach`), so that they do not count as growth.
+        """
+        return self.track_memory or memory_tracker.is_enabled()
+
+    def _start_tracking(self):
+        if self._tracks_memory():
+            self._memory_snapshot = memory_tracker.take_snapshot()
+            self._pending_requests = memory_tracker.PendingRequests()
+        if phase_timer.is_enabled():
+            self._phase_timer = phase_timer.PhaseTimer(phase_timer.FIXTURES)
+
+    def _wrap_step(self, name, step):
+        """
+        Wraps `_pre_setup`, `setUp` and `tearDown` as they are looked up to be called, to start
+        tracking the test and to tell its phases apart. They are not overridden instead, since
+        `_pre_setup` is a classmethod as of django 5.1 and an instance method before that, and
+        `unittest` only calls `setUp` and `tearDown` through overridable hooks as of python 3.8.
+        """
+        def wrapper(*args, **kwargs):
+            if name == '_pre_setup':
+                self._start_tracking()
+            elif name == 'tearDown':
+                self._switch_phase(phase_timer.TEARDOWN)
+            result = step(*args, **kwargs)
+            if name == '_pre_setup':
+                self._switch_phase(phase_timer.SETUP)
+            elif name == 'setUp':
+                self._switch_phase(phase_timer.TEST)
+            return result
+        return wrapper
+
+    def _post_teardown(self):
+        self._switch_phase(phase_timer.ROLLBACK)
+        super(BaseViewTest, self)._post_teardown()
+        if self._phase_timer is not None:
+            phase_timer.record(self.__class__.__module__.split('.')[0], self.__class__.__name__,
+                               self._testMethodName, self._phase_timer.stop())
+            self._phase_timer = None
+        if self._memory_snapshot is not None:
+            # Clients are only kept between tests by the suite, so what they still hold on to
+            # is not growth of the test.
+            self.api_client = self.request_factory = None
+            snapshot = memory_tracker.take_snapshot()
+            self._pending_requests.close(snapshot, force=True)
+            memory_tracker.record(
+                'test', '{}.{}'.format(self.__class__.__name__, self._testMethodName),
+                self._memory_snapshot, snapshot)
+            self._memory_snapshot = self._pending_requests = None
+
     def _get_auth_provider(self) -> AuthProvider:
         if not self.auth_provider_class:
             try:
@@ -50,8 +148,32 @@ class BaseViewTest(APITestCase, metaclass=ABCTestMeta):
         """
         raise NotImplementedError()
 
+    def _get_url(self, kwargs=None):
+        """
+        Returns the url `_make_url` builds for given kwargs. When `url_cache_size` is set,
+        up to that many urls are kept per test class so that `reverse` is not called again
+        for kwargs which have already been seen. Only set it if `_make_url` depends on nothing
+        but its kwargs. Cached urls are dropped whenever `ROOT_URLCONF` is overridden.
+        """
+        if not self.url_cache_size:
+            return self._make_url(kwargs=kwargs)
+        key = tuple(sorted(kwargs.items())) if isinstance(kwargs, dict) else kwargs
+        try:
+            hash(key)
+        except TypeError:
+            return self._make_url(kwargs=kwargs)
+        cache = url_caches.setdefault(self.__class__, OrderedDict())
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        url = self._make_url(kwargs=kwargs)
+        cache[key] = url
+        if len(cache) > self.url_cache_size:
+            cache.popitem(last=False)
+        return url
+
     def test_resolves_view(self, *_):
-        self.assertIsNotNone(resolve(self._make_url(self._get_default_url_kwargs())))
+        self.assertIsNotNone(resolve(self._get_url(self._get_default_url_kwargs())))
 
     def _get_default_url_kwargs(self):
         """
@@ -64,7 +186,7 @@ class BaseViewTest(APITestCase, metaclass=ABCTestMeta):
 
     def test_calling_endpoint(self, *_):
         try:
-            response = self.api_client.get(self._make_url(self._get_default_url_kwargs()))
+            response = self.api_client.get(self._get_url(self._get_default_url_kwargs()))
             self.assertNotEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         except Exception:
             traceback.print_exc()
@@ -137,18 +259,75 @@ class BaseViewTest(APITestCase, metaclass=ABCTestMeta):
         if not docs or format != 'json':
             return
         extra = extra or {}
-        self._get_auth_provider().set_auth(self.api_client, user)
+        with self._timing_phase(phase_timer.AUTH):
+            self._get_auth_provider().set_auth(self.api_client, user)
         headers = self._modify_headers(extra)
-        if method == self.api_client.get:
-            response = method(self._make_url(kwargs=url_kwargs), data=data, **headers)
-        else:
-            response = method(
-                self._make_url(kwargs=url_kwargs), data=data, format=format, **headers)
+        with self._timing_phase(phase_timer.REQUEST):
+            url = self._get_url(kwargs=url_kwargs)
+        snapshot = None
+        if self._pending_requests is not None:
+            snapshot = memory_tracker.take_snapshot()
+            self._pending_requests.close(snapshot)
+        with self._timing_phase(phase_timer.REQUEST), \
+                self._intercept_outbound_http() as outbound, \
+                self._time_rendering() as render_timer:
+            if method == self.api_client.get:
+                response = method(url, data=data, **headers)
+            else:
+                response = method(url, data=data, format=format, **headers)
+        if snapshot is not None:
+            self._pending_requests.add(
+                response_profiler.get_endpoint(response, method.__name__, url), snapshot, response)
         if format != 'json':
             return response
-        self._generate_docs(response, method, data, url_kwargs, format, headers, user)
+        with self._timing_phase(phase_timer.DOCS):
+            self._generate_docs(response, method, data, url_kwargs, format, headers, user,
+                                url=url, outbound=outbound, render_timer=render_timer)
         return response
 
+    def _switch_phase(self, phase):
+        if self._phase_timer is not None:
+            self._phase_timer.switch(phase)
+
+    @contextmanager
+    def _timing_phase(self, phase):
+        """
+        If `DRF_TEST_TIMING_REPORT` is set, time spent inside the block is counted as `phase` of
+        current test rather than the test itself.
+        """
+        if self._phase_timer is None:
+            yield
+            return
+        with self._phase_timer.phase(phase):
+            yield
+
+    @contextmanager
+    def _time_rendering(self):
+        """
+        If `DRF_TEST_PROFILE_RESPONSES` is set, serializers and renderers are timed while the
+        request is handled. Yields the `RenderTimer`, or None if profiling is not enabled.
+        """
+        if not response_profiler.is_enabled():
+            yield None
+            return
+        with response_profiler.RenderTimer().use() as render_timer:
+            yield render_timer
+
+    @contextmanager
+    def _intercept_outbound_http(self):
+        """
+        If `DRF_TEST_CASSETTES_DIR` is set, outbound http calls made while handling the request
+        are recorded to (or replayed from) the cassette of current test. Yields list of those
+        calls, or None if cassettes are not enabled.
+        """
+        if not cassette.is_enabled():
+            yield None
+            return
+        if self._cassette is None:
+            self._cassette = Cassette(cassette.get_cassette_path(self.id()))
+        with self._cassette.use() as outbound:
+            yield outbound
+
     def _ensure_json_serializable(self, obj, fail_silently=True):
         try:
             json.dumps(obj, cls=UUIDEncoder)
@@ -167,13 +346,15 @@ class BaseViewTest(APITestCase, metaclass=ABCTestMeta):
             'HTTP_' + k.upper().replace('-', '_'): v for k, v in headers.items()
         }
 
-    def _generate_docs(self, response, method, data, url_kwargs, format, headers, user):
+    def _generate_docs(self, response, method, data, url_kwargs, format, headers, user,
+                       url=None, outbound=None, render_timer=None):
         if self.current_test_name in ['test_has_permission_classes',
                                       'test_resolves_view',
                                       'test_calling_endpoint']:
             return
         app_name = self.__class__.__module__.split('.')[0]
-        url = self._make_url(url_kwargs)
+        if url is None:
+            url = self._get_url(url_kwargs)
         method_name = {
             self.api_client.get: 'get',
             self.api_client.post: 'post',
@@ -182,29 +363,39 @@ class BaseViewTest(APITestCase, metaclass=ABCTestMeta):
             self.api_client.put: 'put'
         }[method]
         response_data = self._get_response_data(response)
+        content_type = response['content-type']
+        if self._pending_requests is not None:
+            url, data, response_data, content_type = memory_tracker.detach(
+                [url, data, response_data, content_type])
         headers = headers or {}
-        headers.update(self._get_auth_provider().get_auth_headers(user))
+        with self._timing_phase(phase_timer.AUTH):
+            headers.update(self._get_auth_provider().get_auth_headers(user))
         doc_generator.class_docs[self.__class__.__name__] = self.__class__.__doc__
-        doc_generator.store.append({
-            'method': method_name,
-            'data': self._ensure_json_serializable(data),
-            'url': url,
-            'url_kwargs': self._ensure_json_serializable(url_kwargs),
-            'format': format,
-            'headers': headers,
-            'success': 200 <= response.status_code < 300,
-            'meta': {
-                'docs': self.current_test_doc,
-                'method_name': self.current_test_name,
-                'class_name': self.__class__.__name__,
-                'app_name': app_name
-            },
-            'response': {
-                'data': response_data,
-                'content_type': response['content-type'],
-                'status': response.status_code,
-            }
-        })
+        meta = DocMeta.get(
+            docs=self.current_test_doc,
+            method_name=self.current_test_name,
+            class_name=self.__class__.__name__,
+            app_name=app_name,
+        )
+        if render_timer is not None:
+            response_profiler.profile_response(response, response_data, method_name, url, meta,
+                                               render_timer)
+        doc_generator.add_entry(DocEntry(
+            method=method_name,
+            data=self._ensure_json_serializable(data),
+            url=url,
+            url_kwargs=self._ensure_json_serializable(url_kwargs),
+            format=format,
+            headers=headers,
+            success=200 <= response.status_code < 300,
+            meta=meta,
+            response=DocResponse(
+                data=response_data,
+                content_type=content_type,
+                status=response.status_code,
+            ),
+            outbound=outbound,
+        ))
 
     def _get_response_data(self, response):
         if response.get('content-type') == 'application/json':
@@ -228,6 +419,8 @@ class BaseViewTest(APITestCase, metaclass=ABCTestMeta):
 
     def __getattribute__(self, item):
         result = super(BaseViewTest, self).__getattribute__(item)
+        if item in ('_pre_setup', 'setUp', 'tearDown'):
+            return self._wrap_step(item, result)
         if item and callable(result) and item.startswith('test'):
             BaseViewTest.current_test_doc = result.__doc__
             BaseViewTest.current_test_name = result.__name__
@@ -0,0 +1,199 @@
+import base64
+import io
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+try:
+    from urllib3 import connectionpool
+    from urllib3.response import HTTPResponse
+    from urllib3._collections import HTTPHeaderDict
+except ImportError:
+    connectionpool = None
+
+"""
+A cassette keeps outbound http calls made by views under test, so that they can be replayed
+instead of being sent again. Each test has its own cassette file, which is a json file of the
+following format:
+{
+    'interactions': [
+        {
+            'request': {
+                'method': 'GET',
+                'url': 'http://service.local:80/api/things/',
+                'body': '{Request body if it is text, otherwise None}',
+            },
+            'response': {
+                'status': 200,
+                'reason': 'OK',
+                'headers': [['Content-Type', 'application/json']],
+                'body': '{Response body if it is text which is not content-encoded}',
+                'body_base64': '{Response body encoded as base64, if body is not set}',
+            }
+        }
+    ]
+}
+Calls are intercepted where urllib3 connection pools send requests, which covers `requests`
+as well as plain `urllib3`.
+"""
+
+
+class CassetteError(Exception):
+    pass
+
+
+def is_enabled():
+    return bool(getattr(settings, 'DRF_TEST_CASSETTES_DIR', None))
+
+
+def get_cassette_path(test_id):
+    """
+    Cassettes live in `DRF_TEST_CASSETTES_DIR` and are named after `test_id` of their test.
+    """
+    return os.path.join(os.path.expanduser(settings.DRF_TEST_CASSETTES_DIR),
+                        '{}.json'.format(test_id))
+
+
+def _to_text(body):
+    if isinstance(body, str):
+        return body
+    if isinstance(body, bytes):
+        try:
+            return body.decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+    return None
+
+
+def _iter_headers(headers):
+    return getattr(headers, 'iteritems', headers.items)()
+
+
+def _full_url(pool, url):
+    if url.startswith('/'):
+        return '{}://{}:{}{}'.format(pool.scheme, pool.host, pool.port, url)
+    return url
+
+
+class Cassette:
+    """
+    Records outbound calls to its file if the file does not exist yet. Otherwise replays calls
+    from the file and raises `CassetteError` for calls which were not recorded.
+    Delete the file to record again.
+    """
+    _active = None
+
+    def __init__(self, path):
+        self.path = path
+        self.recording = not os.path.exists(path)
+        self.interactions = []
+        self._replayed = set()
+        self._local = threading.local()
+        if not self.recording:
+            with open(path) as cassette_file:
+                self.interactions = json.load(cassette_file)['interactions']
+
+    @contextmanager
+    def use(self):
+        """
+        Intercepts outbound calls while the block runs. Yields a list which collects a summary
+        (`{'method', 'url', 'status'}`) of each call made in the block. Full interactions are
+        only kept by the cassette itself.
+        """
+        if connectionpool is None:
+            raise ImportError('urllib3 is required for DRF_TEST_CASSETTES_DIR to work')
+        if Cassette._active is not None:
+            raise CassetteError('Another cassette is already in use')
+        Cassette._active = self
+        original_urlopen = connectionpool.HTTPConnectionPool.urlopen
+        cassette = self
+        used = []
+
+        def urlopen(pool, method, url, body=None, headers=None, **kwargs):
+            return cassette._urlopen(original_urlopen, used, pool, method, url, body, headers,
+                                     **kwargs)
+
+        connectionpool.HTTPConnectionPool.urlopen = urlopen
+        try:
+            yield used
+        finally:
+            connectionpool.HTTPConnectionPool.urlopen = original_urlopen
+            Cassette._active = None
+            if self.recording and used:
+                self.save()
+
+    def _urlopen(self, original_urlopen, used, pool, method, url, body, headers, **kwargs):
+        if getattr(self._local, 'depth', 0):
+            # Redirects and retries call urlopen again. Only the outermost call is recorded.
+            return original_urlopen(pool, method, url, body=body, headers=headers, **kwargs)
+        request = {'method': method, 'url': _full_url(pool, url), 'body': _to_text(body)}
+        if self.recording:
+            self._local.depth = 1
+            try:
+                interaction = self._record(original_urlopen, pool, method, url, body, headers,
+                                           request, **kwargs)
+            finally:
+                self._local.depth = 0
+            self.interactions.append(interaction)
+        else:
+            interaction = self._find(request)
+        used.append({
+            'method': request['method'],
+            'url': request['url'],
+            'status': interaction['response']['status'],
+        })
+        return self._build_response(interaction['response'], method, kwargs)
+
+    def _record(self, original_urlopen, pool, method, url, body, headers, request, **kwargs):
+        kwargs.update(preload_content=False, decode_content=False)
+        response = original_urlopen(pool, method, url, body=body, headers=headers, **kwargs)
+        raw_body = response.read(decode_content=False)
+        response.release_conn()
+        recorded = {
+            'status': response.status,
+            'reason': response.reason,
+            'headers': [[k, v] for k, v in _iter_headers(response.headers)],
+        }
+        text = None if response.headers.get('content-encoding') else _to_text(raw_body)
+        if text is None:
+            recorded['body_base64'] = base64.b64encode(raw_body).decode('ascii')
+        else:
+            recorded['body'] = text
+        return {'request': request, 'response': recorded}
+
+    def _find(self, request):
+        for i, interaction in enumerate(self.interactions):
+            recorded = interaction['request']
+            if i in self._replayed:
+                continue
+            if recorded['method'] == request['method'] and recorded['url'] == request['url']:
+                self._replayed.add(i)
+                return interaction
+        raise CassetteError('{method} {url} is not recorded in {path}. Delete the cassette to '
+                            'record it again.'.format(path=self.path, **request))
+
+    def _build_response(self, recorded, method, kwargs):
+        if 'body' in recorded:
+            raw_body = recorded['body'].encode('utf-8')
+        else:
+            raw_body = base64.b64decode(recorded['body_base64'])
+        return HTTPResponse(
+            body=io.BytesIO(raw_body),
+            headers=HTTPHeaderDict(recorded['headers']),
+            status=recorded['status'],
+            reason=recorded['reason'],
+            preload_content=kwargs.get('preload_content', True),
+            decode_content=kwargs.get('decode_content', True),
+            request_method=method,
+        )
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.path, 'w+') as cassette_file:
+            json.dump({'interactions': self.interactions}, cassette_file, indent=4,
+                      sort_keys=True)
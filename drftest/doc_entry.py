@@ -0,0 +1,85 @@
+import sys
+from collections.abc import Mapping
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _Record(Mapping):
+    """
+    Base class of records kept in `doc_generator.store`. Records use `__slots__` to keep the
+    per entry overhead low, but they still behave like read-only dictionaries whose keys are
+    their slots. So templates and code written against the plain dictionary format keep working.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.as_dict())
+
+    def as_dict(self):
+        """
+        Returns a plain (nested) dictionary in the format described in `doc_generator`.
+        """
+        return {key: value.as_dict() if isinstance(value, _Record) else value
+                for key, value in self.items()}
+
+
+class DocMeta(_Record):
+    """
+    Describes which test produced an entry. All requests sent by a single test share the same
+    `DocMeta` instance and its strings are interned, so they are not copied for every request.
+    """
+    __slots__ = ('docs', 'method_name', 'class_name', 'app_name')
+    _instances = {}
+
+    def __init__(self, docs, method_name, class_name, app_name):
+        self.docs = _intern(docs)
+        self.method_name = _intern(method_name)
+        self.class_name = _intern(class_name)
+        self.app_name = _intern(app_name)
+
+    @classmethod
+    def get(cls, docs, method_name, class_name, app_name):
+        key = (docs, method_name, class_name, app_name)
+        if key not in cls._instances:
+            cls._instances[key] = cls(docs, method_name, class_name, app_name)
+        return cls._instances[key]
+
+
+class DocResponse(_Record):
+    __slots__ = ('data', 'content_type', 'status')
+
+    def __init__(self, data, content_type, status):
+        self.data = data
+        self.content_type = _intern(content_type)
+        self.status = status
+
+
+class DocEntry(_Record):
+    __slots__ = ('method', 'data', 'url', 'url_kwargs', 'format', 'headers', 'success', 'meta',
+                 'response', 'outbound')
+
+    def __init__(self, method, data, url, url_kwargs, format, headers, success,
+                 meta: DocMeta, response: DocResponse, outbound=None):
+        self.method = _intern(method)
+        self.data = data
+        self.url = _intern(url)
+        self.url_kwargs = url_kwargs
+        self.format = _intern(format)
+        self.headers = headers
+        self.success = success
+        self.meta = meta
+        self.response = response
+        self.outbound = outbound
@@ -1,12 +1,21 @@
+import json
+import multiprocessing
 import os
 import shutil
 import textwrap
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 from django.conf import settings
 from django.template import loader
+from django.utils.html import escape
 from django.utils.safestring import mark_safe
 
+from drftest import response_profiler, search_index
+
 """
+store keeps a `drftest.doc_entry.DocEntry` for each request sent in tests. Entries behave like
+dictionaries of the following format (plain dictionaries of this format are accepted as well):
 {
     'method': 'POST',
     'data': {'a': 'b'},
@@ -23,8 +32,11 @@ from django.utils.safestring import mark_safe
     },
     'response': {
         'data': {'a': 'b'},
+        'content_type': 'application/json',
         'status': {response status code. eg. 200},
-    }
+    },
+    'outbound': [{'method': 'GET', 'url': '{Url of an outbound http call}', 'status': 200}]
+                or None if cassettes are not enabled,
 }
 """
 store = []
@@ -34,26 +46,98 @@ class_docs keeps a dictionary which maps name of test class to its docs.
 class_docs = {}
 
 
+"""
+categorized indexes entries of `store` by app_name, class_name and method_name. It is kept up to
+date as entries are added via `add_entry`, so writing docs does not need another pass over store.
+"""
+categorized = {}
+_app_sizes = {}
+_indexed_store = None
+_indexed_count = 0
+
+"""
+Templates used to write markdown docs of an app. `doc_of_app.md` includes `doc_of_class.md`.
+"""
+APP_TEMPLATES = ['doc_of_app.md', 'doc_of_test_class.md', 'doc_of_app_index.md']
+
+
+def add_entry(entry):
+    """
+    Appends doc entry of a request to `store` and indexes it in `categorized`.
+    """
+    _sync_index()
+    store.append(entry)
+    _index_entry(entry)
+
+
+def _index_entry(entry):
+    global _indexed_count
+    meta = entry['meta']
+    app_docs = categorized.setdefault(meta['app_name'], {})
+    class_name = meta['class_name']
+    if class_name not in app_docs:
+        app_docs[class_name] = {
+            'methods': {},
+            'description': textwrap.dedent(mark_safe(class_docs.get(class_name) or '')),
+        }
+    app_docs[class_name]['methods'].setdefault(meta['method_name'], []).append(entry)
+    _app_sizes[meta['app_name']] = _app_sizes.get(meta['app_name'], 0) + 1
+    _indexed_count += 1
+
+
+def _sync_index():
+    """
+    Rebuilds `categorized` in case `store` has been replaced or appended to without calling
+    `add_entry`.
+    """
+    global _indexed_store, _indexed_count
+    if _indexed_store is store and _indexed_count == len(store):
+        return
+    categorized.clear()
+    _app_sizes.clear()
+    _indexed_store, _indexed_count = store, 0
+    for entry in store:
+        _index_entry(entry)
+
+
 def _categorize_store():
     """
     doc entry for each test case in `BaseViewTest` is a flat dictionary. with no categorization
     based on app, class or method.
 
-    This function categorizes items in that list by (first) app_name and (secondly) class_name.
+    This function returns items in that list categorized by (first) app_name and (secondly)
+    class_name. Apps, classes and tests of each class are sorted by name so that generated docs
+    do not depend on the order in which tests are run. Requests sent by a single test keep the
+    order in which they were sent.
     """
-    categorized = {}
-    for test_result in store:
-        app_name = test_result['meta']['app_name']
-        class_name = test_result['meta']['class_name']
-        if app_name not in categorized:
-            categorized[app_name] = {}
-        if class_name not in categorized[app_name]:
-            categorized[app_name][class_name] = {
-                'tests': [],
-                'description': textwrap.dedent(mark_safe(class_docs.get(class_name) or '')),
-            }
-        categorized[app_name][class_name]['tests'].append(test_result)
-    return categorized
+    _sync_index()
+    return OrderedDict(
+        (app_name, _sort_app_docs(categorized[app_name])) for app_name in sorted(categorized)
+    )
+
+
+def snapshot_app(app_name):
+    """
+    Returns categorized docs of an app, sorted like `_categorize_store` does, along with
+    number of its entries. Returns (None, 0) if app has no entries.
+    """
+    _sync_index()
+    if app_name not in categorized:
+        return None, 0
+    return _sort_app_docs(categorized[app_name]), _app_sizes[app_name]
+
+
+def _sort_app_docs(app_docs):
+    return OrderedDict(
+        (class_name, {
+            'tests': [
+                entry
+                for method_name in sorted(app_docs[class_name]['methods'])
+                for entry in app_docs[class_name]['methods'][method_name]
+            ],
+            'description': app_docs[class_name]['description'],
+        }) for class_name in sorted(app_docs)
+    )
 
 
 def _get_root_dir():
@@ -69,11 +153,10 @@ def _get_docs_path():
     return os.path.join(_get_root_dir(), 'docs')
 
 
-def _clear_docs_path():
+def _clear_docs_path(docs_path):
     """
     Removes everything in docs directory in order to prepare it for new docs.
     """
-    docs_path = _get_docs_path()
     if os.path.exists(docs_path):
         if os.path.isdir(docs_path):
             shutil.rmtree(docs_path)
@@ -82,30 +165,233 @@ def _clear_docs_path():
     os.mkdir(docs_path)
 
 
-def _rewrite_yml(root_dir: str):
+def _split_app_docs():
+    """
+    If `DRF_TEST_SPLIT_APP_DOCS` is set, docs of each app are written to a directory containing
+    a page per test class and an index page, instead of a single page containing every class.
+    """
+    return getattr(settings, 'DRF_TEST_SPLIT_APP_DOCS', False)
+
+
+def _write_app_docs(app_name, app_docs, docs_path, split, templates):
+    """
+    Writes docs of an app and returns its entry in mkdocs navigation. `templates` maps names of
+    `APP_TEMPLATES` to loaded templates.
+    """
+    if not split:
+        md_path = os.path.join(docs_path, '{}.md'.format(app_name))
+        t = templates['doc_of_app.md']
+        rendered = t.render({
+            'app_name': app_name,
+            'app_docs': app_docs,
+        })
+        with open(md_path, 'w+') as md_file:
+            md_file.write(rendered)
+        return app_name, '{}.md'.format(app_name)
+
+    app_path = os.path.join(docs_path, app_name)
+    if os.path.exists(app_path):
+        shutil.rmtree(app_path)
+    os.mkdir(app_path)
+    t = templates['doc_of_test_class.md']
+    nav = [('Overview', '{}/index.md'.format(app_name))]
+    class_summaries = []
+    for class_name, class_docs in app_docs.items():
+        page = '{}.md'.format(class_name)
+        with open(os.path.join(app_path, page), 'w+') as md_file:
+            md_file.write(t.render({
+                'app_name': app_name,
+                'class_name': class_name,
+                'class_docs': class_docs,
+            }))
+        nav.append((class_name, '{}/{}'.format(app_name, page)))
+        class_summaries.append({
+            'class_name': class_name,
+            'page': page,
+            'tests': len({test['meta']['method_name'] for test in class_docs['tests']}),
+            'requests': len(class_docs['tests']),
+            'failed': sum(1 for test in class_docs['tests'] if not test['success']),
+        })
+    with open(os.path.join(app_path, 'index.md'), 'w+') as index_file:
+        index_file.write(templates['doc_of_app_index.md'].render({
+            'app_name': app_name,
+            'class_summaries': class_summaries,
+        }))
+    return app_name, nav
+
+
+def get_options():
+    """
+    Returns settings which affect how docs of an app are written, along with loaded templates.
+    A background writer gets them once before tests start, so that it is not affected by
+    settings (e.g. `TEMPLATES`) overridden by tests running meanwhile.
+    """
+    return {
+        'root_dir': _get_root_dir(),
+        'docs_path': _get_docs_path(),
+        'split': _split_app_docs(),
+        'search_index': _search_index_enabled(),
+        'templates': {name: loader.get_template(name) for name in APP_TEMPLATES},
+    }
+
+
+def write_app(app_name, app_docs, options):
+    """
+    Writes markdown docs of an app and its search shard. Returns entry of the app in mkdocs
+    navigation and tokens of its shard (None if search index is disabled).
+    """
+    nav_item = _write_app_docs(app_name, app_docs, options['docs_path'], options['split'],
+                               options['templates'])
+    tokens = None
+    if options['search_index']:
+        tokens = search_index.write_shard(options['docs_path'], app_name, app_docs)
+    return nav_item, tokens
+
+
+def _write_nav(yml_file, nav, indent=''):
+    for title, target in nav:
+        if isinstance(target, list):
+            yml_file.write('{}- {}:\n'.format(indent, json.dumps(title)))
+            _write_nav(yml_file, target, indent + '    ')
+        else:
+            yml_file.write('{}- {}: {}\n'.format(indent, json.dumps(title), json.dumps(target)))
+
+
+def _rewrite_yml(root_dir: str, nav=None):
+    """
+    Writes mkdocs.yml. `nav` is a list of (title, page) pairs where page is either path of a
+    markdown file relative to docs directory or another such list.
+    """
     yml_path = os.path.join(root_dir, 'mkdocs.yml')
     with open(yml_path, 'w+') as yml_file:
         yml_file.write('site_name: DRF Tests\n')
         yml_file.write('theme: readthedocs\n')
+        if nav:
+            yml_file.write('nav:\n')
+            _write_nav(yml_file, nav)
 
 
-def write_docs():
-    if not hasattr(settings, 'DRF_TEST_DOCS_DIR') or not settings.DRF_TEST_DOCS_DIR:
-        return
+def docs_format():
+    """
+    `DRF_TEST_DOCS_FORMAT` is either 'markdown' (the default), which writes pages to be built by
+    mkdocs, or 'html', which writes a static website that needs no further build step.
+    """
+    return getattr(settings, 'DRF_TEST_DOCS_FORMAT', 'markdown')
 
-    if not os.path.exists(_get_root_dir()):
-        os.mkdir(_get_root_dir())
 
-    _clear_docs_path()
-    for app_name, app_docs in _categorize_store().items():
-        md_path = os.path.join(_get_docs_path(), '{}.md'.format(app_name))
-        t = loader.get_template('doc_of_app.md')
-        rendered = t.render({
-            'app_name': app_name,
-            'app_docs': app_docs,
+def _search_index_enabled():
+    """
+    A search index is written if `DRF_TEST_SEARCH_INDEX` is set. It defaults to `True` for html
+    docs, which come with a search box using the index, and to `False` for markdown docs.
+    """
+    return getattr(settings, 'DRF_TEST_SEARCH_INDEX', docs_format() == 'html')
+
+
+def _get_workers():
+    """
+    Number of processes which render html pages of apps in parallel. Rendering templates is
+    cpu bound, so threads would take turns holding the GIL instead. Workers are forked from the
+    test runner, which is not safe if it runs other threads (e.g. of database drivers), so it
+    defaults to 1 which renders pages in process.
+    """
+    return getattr(settings, 'DRF_TEST_DOCS_WORKERS', None) or 1
+
+
+def _write_html_page(file_name, title, chunks, site):
+    """
+    Writes an html page to docs directory. `chunks` is an iterable of rendered parts of body of
+    the page. Each chunk is written as soon as it is rendered so that the whole page is never
+    kept in memory. `site` is a dictionary describing what pages and features the site has,
+    which is used to render navigation.
+    """
+    context = dict(site, title=title, assets_url='assets/')
+    with open(os.path.join(_get_docs_path(), file_name), 'w+') as html_file:
+        html_file.write(loader.get_template('doc_page_start.html').render(context))
+        for chunk in chunks:
+            html_file.write(chunk)
+        html_file.write(loader.get_template('doc_page_end.html').render(context))
+
+
+def _render_html_app_chunks(app_name, app_docs):
+    yield '<h1>{}</h1>\n'.format(escape(app_name))
+    t = loader.get_template('doc_of_class.html')
+    for class_name, class_docs in app_docs.items():
+        yield t.render({
+            'class_name': class_name,
+            'class_docs': class_docs,
         })
-        with open(md_path, 'w+') as md_file:
-            md_file.write(rendered)
+
+
+def _write_html_app_page(app_name, app_docs, site):
+    _write_html_page('{}.html'.format(app_name), app_name,
+                     _render_html_app_chunks(app_name, app_docs), site)
+
+
+"""
+_forked_store is the categorized store whose pages are being written by forked workers. They
+read docs of an app from the copy they inherited, so that only names of apps are pickled.
+"""
+_forked_store = None
+
+
+def _write_forked_html_app_page(app_name, site):
+    _write_html_app_page(app_name, _forked_store[app_name], site)
+
+
+def _get_fork_context():
+    """
+    Returns None on platforms which cannot fork, where pages are written one after another.
+    """
+    try:
+        return multiprocessing.get_context('fork')
+    except ValueError:
+        return None
+
+
+def _write_html_docs(categorized_store, report):
+    global _forked_store
+    shutil.copytree(os.path.join(os.path.dirname(__file__), 'static', 'drftest'),
+                    os.path.join(_get_docs_path(), 'assets'))
+    site = {
+        'app_names': list(categorized_store),
+        'has_profile': report is not None,
+        'search_url': search_index.DIR_NAME + '/' if _search_index_enabled() else None,
+    }
+    workers = min(_get_workers(), len(categorized_store))
+    context = _get_fork_context() if workers > 1 else None
+    if context is None:
+        for app_name, app_docs in categorized_store.items():
+            _write_html_app_page(app_name, app_docs, site)
+    else:
+        _forked_store = categorized_store
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                futures = [executor.submit(_write_forked_html_app_page, app_name, site)
+                           for app_name in categorized_store]
+                for future in futures:
+                    future.result()
+        finally:
+            _forked_store = None
+    _write_html_page('index.html', None, [loader.get_template('doc_index.html').render()], site)
+    if report is not None:
+        _write_html_page('{}.html'.format(response_profiler.PAGE_NAME), 'Response profile',
+                         [response_profiler.render_page(report, 'html')], site)
+
+
+def _write_markdown_docs(report, written):
+    options = get_options()
+    _sync_index()
+    nav = [('Home', 'index.md')]
+    tokens_by_app = OrderedDict()
+    for app_name in sorted(categorized):
+        if app_name in written and written[app_name][0] == _app_sizes[app_name]:
+            _, nav_item, tokens = written[app_name]
+        else:
+            nav_item, tokens = write_app(app_name, _sort_app_docs(categorized[app_name]), options)
+        nav.append(nav_item)
+        tokens_by_app[app_name] = tokens
+    if options['search_index']:
+        search_index.write_manifest(options['docs_path'], tokens_by_app)
     index_path = os.path.join(_get_docs_path(), 'index.md')
     with open(index_path, 'w+') as index_file:
         index_file.write("""
@@ -119,5 +405,44 @@ each item to visit documentation of that subsystem.
 
 Happy coding :)
         """)
+    if report is not None:
+        page = '{}.md'.format(response_profiler.PAGE_NAME)
+        with open(os.path.join(_get_docs_path(), page), 'w+') as md_file:
+            md_file.write(response_profiler.render_page(report, 'md'))
+        nav.append(('Response profile', page))
+
+    _rewrite_yml(_get_root_dir(), nav)
+
+
+def docs_enabled():
+    return hasattr(settings, 'DRF_TEST_DOCS_DIR') and bool(settings.DRF_TEST_DOCS_DIR)
+
+
+def prepare_docs_dir(root_dir=None):
+    root_dir = root_dir or _get_root_dir()
+    if not os.path.exists(root_dir):
+        os.mkdir(root_dir)
+    _clear_docs_path(os.path.join(root_dir, 'docs'))
+
+
+def write_docs(written=None):
+    """
+    Writes docs of all tests. `written` maps names of apps whose docs have already been written
+    by `drftest.doc_writer` to (number of entries they were written with, what `write_app`
+    returned). Those apps are only written again if they have got new entries since.
+    """
+    if not docs_enabled():
+        return
 
-    _rewrite_yml(_get_root_dir())
+    if written is None:
+        prepare_docs_dir()
+    report = None
+    if response_profiler.profiles:
+        report = response_profiler.write_report(_get_root_dir())
+    if docs_format() == 'html':
+        categorized_store = _categorize_store()
+        if _search_index_enabled():
+            search_index.write_index(_get_docs_path(), categorized_store, as_script=True)
+        _write_html_docs(categorized_store, report)
+    else:
+        _write_markdown_docs(report, written or {})
@@ -0,0 +1,127 @@
+import queue
+import threading
+import traceback
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.template.base import Template
+
+from drftest import doc_generator
+
+"""
+writer is the running `BackgroundDocWriter` if `DRF_TEST_BACKGROUND_DOCS` is set.
+"""
+writer = None
+
+
+class BackgroundDocWriter(threading.Thread):
+    """
+    Writes docs of apps on a separate thread while tests of other apps are still running, so
+    that little is left to do once all tests are run.
+
+    Tests of an app are usually run one after another. So when a test class of another app
+    starts, docs of the previous app are handed to this thread. If an app gets more entries
+    after that, `doc_generator.write_docs` writes it again.
+
+    Docs of the previous run are only removed once the first app is handed off, so that they
+    are kept if tests crash or are interrupted early on.
+    """
+
+    def __init__(self, options):
+        super().__init__(name='drftest-doc-writer', daemon=True)
+        self.options = options
+        self.queue = queue.Queue()
+        self.written = {}
+        self.current_app = None
+        self.prepared = False
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            app_name, app_docs, size = item
+            try:
+                if not self.prepared:
+                    doc_generator.prepare_docs_dir(self.options['root_dir'])
+                    self.prepared = True
+                with _without_test_instrumentation():
+                    self.written[app_name] = (size,) + doc_generator.write_app(
+                        app_name, app_docs, self.options)
+            except Exception:
+                traceback.print_exc()
+
+    def class_started(self, app_name):
+        if self.current_app is not None and app_name != self.current_app:
+            self.hand_off(self.current_app)
+        self.current_app = app_name
+
+    def hand_off(self, app_name):
+        app_docs, size = doc_generator.snapshot_app(app_name)
+        if app_docs is not None:
+            self.queue.put((app_name, app_docs, size))
+
+    def finish(self):
+        """
+        Waits for docs which have been handed off to be written and returns them in the format
+        `doc_generator.write_docs` expects, or None if docs directory has not been prepared.
+        """
+        self.queue.put(None)
+        self.join()
+        return self.written if self.prepared else None
+
+
+@contextmanager
+def _without_test_instrumentation():
+    """
+    Django's test environment instruments `Template._render` to send `template_rendered`, which
+    test clients listen to regardless of the thread sending it. So templates rendered by a
+    writer would show up in responses of tests running meanwhile. While this is in use, writer
+    threads render templates the way django does outside tests, while other threads keep the
+    instrumentation.
+    """
+    render = Template._render
+
+    def _render(template, context):
+        if isinstance(threading.current_thread(), BackgroundDocWriter):
+            return template.nodelist.render(context)
+        return render(template, context)
+
+    Template._render = _render
+    try:
+        yield
+    finally:
+        # Tearing down the test environment meanwhile restores the original.
+        if Template._render is _render:
+            Template._render = render
+
+
+def start():
+    """
+    Starts a background writer if `DRF_TEST_BACKGROUND_DOCS` is set. Only markdown docs are
+    written in background, since navigation of each html page lists every app.
+    """
+    global writer
+    if not getattr(settings, 'DRF_TEST_BACKGROUND_DOCS', False) or \
+            not doc_generator.docs_enabled() or doc_generator.docs_format() == 'html':
+        return
+    writer = BackgroundDocWriter(doc_generator.get_options())
+    writer.start()
+
+
+def class_started(app_name):
+    if writer is not None:
+        writer.class_started(app_name)
+
+
+def finish():
+    """
+    Stops the background writer and returns apps it has written, or None if it was not
+    running or has not written anything.
+    """
+    global writer
+    if writer is None:
+        return None
+    written = writer.finish()
+    writer = None
+    return written
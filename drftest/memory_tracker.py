@@ -0,0 +1,195 @@
+import gc
+import os
+import sys
+import tracemalloc
+import weakref
+from collections import OrderedDict
+
+from django.conf import settings
+
+"""
+While memory is tracked, records keeps a dictionary of the following format for each request
+sent in tests and for each test:
+{
+    'kind': 'request' or 'test',
+    'name': 'post /api/things/<int:pk>/' for requests or '{Class name}.{Test name}' for tests,
+    'size_diff': {Net number of bytes allocated during the request or test and not freed},
+    'top': [{'location': '{file}:{line}', 'size_diff': {bytes}}, ...],
+}
+`top` lists code locations whose allocations grew the most. Requests are measured once their
+responses are gone (see `PendingRequests`) and tests once they are torn down, so that memory
+which is only held by the response does not count as growth.
+"""
+records = []
+
+TOP_LOCATIONS = 3
+REPORT_SIZE = 10
+
+_started_tracing = False
+_drftest_dir = os.path.dirname(os.path.abspath(__file__))
+_ignored_traces = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    tracemalloc.Filter(False, '<unknown>'),
+    # Django's test client registers a finalizer on itself for every request, which is only
+    # freed along with the client.
+    tracemalloc.Filter(False, weakref.__file__),
+] + [
+    # Doc entries and records kept by drftest itself are expected to grow.
+    tracemalloc.Filter(False, os.path.join(_drftest_dir, name))
+    for name in os.listdir(_drftest_dir) if name.endswith('.py')
+]
+
+
+def is_enabled():
+    return getattr(settings, 'DRF_TEST_TRACK_MEMORY', False)
+
+
+def take_snapshot():
+    """
+    Starts tracing memory allocations on first use. Garbage is collected first, so that objects
+    which are only kept alive by reference cycles do not count as allocated.
+    """
+    global _started_tracing
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracing = True
+    gc.collect()
+    return tracemalloc.take_snapshot().filter_traces(_ignored_traces)
+
+
+def stop():
+    """
+    Stops tracing if it was started by `take_snapshot`.
+    """
+    global _started_tracing
+    if _started_tracing:
+        tracemalloc.stop()
+        _started_tracing = False
+
+
+def detach(data):
+    """
+    Deep copies json like `data`, including its strings and numbers, so that docs of a request
+    do not keep objects allocated by the view alive. The copies are allocated here, and so are
+    not counted as growth.
+    """
+    if isinstance(data, dict):
+        return {detach(key): detach(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [detach(item) for item in data]
+    if isinstance(data, str):
+        # Slicing a string as a whole returns the same object, while this makes a new one.
+        return (data + ' ')[:-1]
+    if type(data) in (int, float):
+        return data * 1
+    return data
+
+
+def record(kind, name, before, after, shared_by=1):
+    """
+    Records growth from `before` to `after` snapshot. If the growth is caused by `shared_by`
+    requests together, each is recorded with an equal share of it.
+    """
+    stats = after.compare_to(before, 'lineno')
+    records.append({
+        'kind': kind,
+        'name': name,
+        'size_diff': sum(stat.size_diff for stat in stats) // shared_by,
+        'top': [{
+            'location': '{}:{}'.format(stat.traceback[0].filename, stat.traceback[0].lineno),
+            'size_diff': stat.size_diff // shared_by,
+        } for stat in stats[:TOP_LOCATIONS] if stat.size_diff > 0],
+    })
+
+
+class PendingRequests:
+    """
+    Requests sent by a test whose growth is not recorded yet. A response holds the data the view
+    returned, so growth of a request is measured from a snapshot taken before it is sent to the
+    first snapshot taken after its response is gone (usually before the next request or once
+    the test is torn down). When the test still references a response as the next request is
+    sent (e.g. by reusing a `response` variable), the requests are measured together and share
+    their growth.
+    """
+    __slots__ = ('requests',)
+
+    def __init__(self):
+        self.requests = []
+
+    def add(self, name, before, response):
+        self.requests.append((name, before, weakref.ref(response)))
+
+    def close(self, snapshot, force=False):
+        """
+        Records pending requests if their responses are gone, or regardless if `force` is set.
+        """
+        if not self.requests:
+            return
+        if not force and any(response() is not None for _, _, response in self.requests):
+            return
+        before = self.requests[0][1]
+        for name, _, _ in self.requests:
+            record('request', name, before, snapshot, shared_by=len(self.requests))
+        self.requests = []
+
+
+def build_report(kind, limit=REPORT_SIZE):
+    """
+    Aggregates records of given kind by name and returns the `limit` ones which grew memory the
+    most. Allocations done on first use of an endpoint (caches, lazy imports, etc.) show up
+    once, while a leak keeps growing with every request.
+    """
+    summaries = OrderedDict()
+    for item in records:
+        if item['kind'] != kind:
+            continue
+        summary = summaries.setdefault(item['name'], {
+            'name': item['name'],
+            'count': 0,
+            'grew': 0,
+            'size_diff': 0,
+            'locations': {},
+        })
+        summary['count'] += 1
+        summary['grew'] += item['size_diff'] > 0
+        summary['size_diff'] += item['size_diff']
+        for location in item['top']:
+            summary['locations'][location['location']] = \
+                summary['locations'].get(location['location'], 0) + location['size_diff']
+    offenders = sorted((s for s in summaries.values() if s['size_diff'] > 0),
+                       key=lambda s: (-s['size_diff'], s['name']))[:limit]
+    for summary in offenders:
+        summary['locations'] = sorted(summary['locations'].items(),
+                                      key=lambda item: (-item[1], item[0]))[:TOP_LOCATIONS]
+    return offenders
+
+
+def _format_size(size):
+    if abs(size) < 1024:
+        return '{:+d} B'.format(size)
+    if abs(size) < 1024 * 1024:
+        return '{:+.1f} KiB'.format(size / 1024)
+    return '{:+.1f} MiB'.format(size / 1024 / 1024)
+
+
+def format_report(limit=REPORT_SIZE):
+    lines = []
+    for kind, title in [('request', 'endpoints'), ('test', 'tests')]:
+        offenders = build_report(kind, limit)
+        if not offenders:
+            continue
+        lines.append('Memory growth by {} (top {}):'.format(title, len(offenders)))
+        for summary in offenders:
+            lines.append('    {:>12}  {}  (grew in {} of {} runs)'.format(
+                _format_size(summary['size_diff']), summary['name'], summary['grew'],
+                summary['count']))
+            for location, size_diff in summary['locations']:
+                lines.append('        {:>12}  {}'.format(_format_size(size_diff), location))
+    return '\n'.join(lines)
+
+
+def print_report(stream=None):
+    report = format_report()
+    if report:
+        print(report, file=stream or sys.stderr)
@@ -0,0 +1,231 @@
+import json
+import math
+import os
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+FIXTURES = 'fixtures'
+SETUP = 'setup'
+TEST = 'test'
+AUTH = 'auth'
+REQUEST = 'request'
+DOCS = 'docs'
+TEARDOWN = 'teardown'
+ROLLBACK = 'rollback'
+CLASS_SETUP = 'class_setup'
+CLASS_TEARDOWN = 'class_teardown'
+
+"""
+Phases of a test, in the order they usually happen:
+fixtures: `_pre_setup` of django test case, which starts a transaction and loads fixtures.
+setup: `setUp`, which among other things creates `APIClient` and `APIRequestFactory`.
+test: Body of the test, excluding the phases below which happen inside it.
+auth: Calls to auth provider.
+request: Building url of and sending requests.
+docs: Capturing docs (and profiles) of responses.
+teardown: `tearDown`.
+rollback: `_post_teardown` of django test case, which rolls back the transaction.
+"""
+TEST_PHASES = [FIXTURES, SETUP, TEST, AUTH, REQUEST, DOCS, TEARDOWN, ROLLBACK]
+CLASS_PHASES = [CLASS_SETUP, CLASS_TEARDOWN]
+
+"""
+While `DRF_TEST_TIMING_REPORT` is set, records keeps a dictionary of the following format for
+each test:
+{
+    'test': '{Name of class containing the test}.{Name of test}',
+    'class_name': 'Name of class containing the test',
+    'app_name': 'Name of django app containing the test',
+    'total_ms': {Milliseconds test took from `_pre_setup` to `_post_teardown`},
+    'phases': {'{phase}': {Milliseconds spent in phase}},
+}
+"""
+records = []
+
+"""
+class_records maps (app name, class name) of each test class to milliseconds spent in its
+`setUpClass` (class_setup) and `tearDownClass` (class_teardown), which is where django loads
+class level fixtures, runs `setUpTestData` and rolls back its transaction.
+"""
+class_records = OrderedDict()
+
+PERCENTILES = [50, 90, 99]
+REPORT_SIZE = 10
+
+
+def get_report_path():
+    """
+    `DRF_TEST_TIMING_REPORT` is path of the json file the report is written to.
+    """
+    path = getattr(settings, 'DRF_TEST_TIMING_REPORT', None)
+    return os.path.expanduser(path) if path else None
+
+
+def is_enabled():
+    return bool(getattr(settings, 'DRF_TEST_TIMING_REPORT', None))
+
+
+class PhaseTimer:
+    """
+    Splits time a test takes into consecutive phases. Exactly one phase is running at a time.
+    """
+    __slots__ = ('phases', 'current', 'started')
+
+    def __init__(self, phase):
+        self.phases = OrderedDict()
+        self.current = phase
+        self.started = time.perf_counter()
+
+    def switch(self, phase):
+        now = time.perf_counter()
+        self.phases[self.current] = \
+            self.phases.get(self.current, 0) + (now - self.started) * 1000
+        self.current, self.started = phase, now
+
+    @contextmanager
+    def phase(self, phase):
+        """
+        Runs `phase` inside the current phase and switches back to it afterwards.
+        """
+        previous = self.current
+        self.switch(phase)
+        try:
+            yield
+        finally:
+            self.switch(previous)
+
+    def stop(self):
+        self.switch(None)
+        return self.phases
+
+
+def record(app_name, class_name, test_name, phases):
+    records.append({
+        'test': '{}.{}'.format(class_name, test_name),
+        'class_name': class_name,
+        'app_name': app_name,
+        'total_ms': sum(phases.values()),
+        'phases': phases,
+    })
+
+
+def record_class(app_name, class_name, phase, started):
+    """
+    `started` is the `time.perf_counter()` at which `phase` started.
+    """
+    summary = class_records.setdefault((app_name, class_name), {})
+    summary[phase] = summary.get(phase, 0) + (time.perf_counter() - started) * 1000
+
+
+def percentile(values, percent):
+    """
+    Nearest rank percentile of sorted `values`.
+    """
+    if not values:
+        return None
+    return values[max(0, int(math.ceil(percent / 100 * len(values))) - 1)]
+
+
+def _summarize(values):
+    values = sorted(values)
+    summary = OrderedDict([('total_ms', sum(values))])
+    for percent in PERCENTILES:
+        summary['p{}_ms'.format(percent)] = percentile(values, percent)
+    summary['max_ms'] = values[-1] if values else None
+    return summary
+
+
+def build_report():
+    """
+    Ranks tests and test classes by time they took, slowest first, and summarizes time of the
+    whole suite and of each phase using percentiles over tests (or over classes for
+    `CLASS_PHASES`). Time a test did not spend in a phase counts as 0 for that phase.
+    """
+    classes = OrderedDict()
+    for (app_name, class_name), class_phases in class_records.items():
+        classes[app_name, class_name] = {
+            'class_name': class_name,
+            'app_name': app_name,
+            'tests': 0,
+            'total_ms': sum(class_phases.values()),
+            'phases': OrderedDict(class_phases),
+        }
+    for item in records:
+        summary = classes.setdefault((item['app_name'], item['class_name']), {
+            'class_name': item['class_name'],
+            'app_name': item['app_name'],
+            'tests': 0,
+            'total_ms': 0,
+            'phases': OrderedDict(),
+        })
+        summary['tests'] += 1
+        summary['total_ms'] += item['total_ms']
+        for phase, ms in item['phases'].items():
+            summary['phases'][phase] = summary['phases'].get(phase, 0) + ms
+    suite = _summarize(item['total_ms'] for item in records)
+    suite['tests'] = len(records)
+    suite['total_ms'] += sum(sum(p.values()) for p in class_records.values())
+    return {
+        'suite': suite,
+        'phases': OrderedDict(
+            (phase, _summarize(item['phases'].get(phase, 0) for item in records))
+            for phase in TEST_PHASES if any(phase in item['phases'] for item in records)
+        ),
+        'class_phases': OrderedDict(
+            (phase, _summarize(p.get(phase, 0) for p in class_records.values()))
+            for phase in CLASS_PHASES if class_records
+        ),
+        'slowest_tests': sorted(records, key=lambda r: (-r['total_ms'], r['test'])),
+        'slowest_classes': sorted(classes.values(),
+                                  key=lambda c: (-c['total_ms'], c['class_name'])),
+    }
+
+
+def _format_phases(phases):
+    return ', '.join('{} {:.1f}'.format(phase, ms) for phase, ms in
+                     sorted(phases.items(), key=lambda item: -item[1]) if ms >= 0.05)
+
+
+def format_report(report, limit=REPORT_SIZE):
+    suite = report['suite']
+    lines = ['Timing of {} tests: {:.1f} ms in total, p50 {:.1f} ms, p90 {:.1f} ms, '
+             'p99 {:.1f} ms'.format(suite['tests'], suite['total_ms'], suite['p50_ms'],
+                                    suite['p90_ms'], suite['p99_ms'])]
+    lines.append('Time by phase (ms):')
+    for phase, summary in list(report['phases'].items()) + list(report['class_phases'].items()):
+        lines.append('    {:<15} {:>10.1f}  p90 {:.1f}'.format(
+            phase, summary['total_ms'], summary['p90_ms'] or 0))
+    slowest = report['slowest_tests'][:limit]
+    lines.append('Slowest tests (top {}):'.format(len(slowest)))
+    for item in slowest:
+        lines.append('    {:>10.1f} ms  {}.{}'.format(item['total_ms'], item['app_name'],
+                                                      item['test']))
+        lines.append('        {}'.format(_format_phases(item['phases'])))
+    slowest = report['slowest_classes'][:limit]
+    lines.append('Slowest test classes (top {}):'.format(len(slowest)))
+    for item in slowest:
+        lines.append('    {:>10.1f} ms  {}.{}  ({} tests)'.format(
+            item['total_ms'], item['app_name'], item['class_name'], item['tests']))
+    return '\n'.join(lines)
+
+
+def write_report(stream=None):
+    """
+    If `DRF_TEST_TIMING_REPORT` is set and any test has been timed, writes the report to it as
+    json and prints the slowest tests. Returns the report.
+    """
+    path = get_report_path()
+    if not path or not records:
+        return None
+    report = build_report()
+    dir_path = os.path.dirname(path)
+    if dir_path:
+        os.makedirs(dir_path, exist_ok=True)
+    with open(path, 'w+') as report_file:
+        json.dump(report, report_file, indent=4)
+    print(format_report(report), file=stream or sys.stderr)
+    return report
@@ -0,0 +1,193 @@
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.template import loader
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+
+"""
+While `DRF_TEST_PROFILE_RESPONSES` is set, profiles keeps a dictionary of the following format
+for each request which appears in docs:
+{
+    'endpoint': 'get /api/things/<int:pk>/',
+    'url': '/api/things/2/',
+    'test': '{Name of class containing the test}.{Name of method being tested}',
+    'app_name': 'Name of django app containing the test',
+    'bytes': {Size of rendered response body. None for streaming responses},
+    'objects': {Number of dicts, lists and values in response data},
+    'serializer_ms': {Milliseconds spent getting `data` of DRF serializers while the request
+                      was handled. None if no serializer was used},
+    'renderer_ms': {Milliseconds the DRF renderer took to render the response. None if the
+                    view did not return a DRF response},
+}
+"""
+profiles = []
+
+REPORT_FILE_NAME = 'response_profile.json'
+PAGE_NAME = 'response_profile'
+
+
+def is_enabled():
+    return getattr(settings, 'DRF_TEST_PROFILE_RESPONSES', False)
+
+
+def _get_budget():
+    """
+    Responses larger than `DRF_TEST_RESPONSE_SIZE_BUDGET` (in bytes) are flagged in the report.
+    """
+    return getattr(settings, 'DRF_TEST_RESPONSE_SIZE_BUDGET', None)
+
+
+def count_objects(data):
+    """
+    Counts dicts, lists and values nested in `data`. Iterates instead of recursing so that deeply
+    nested responses, which are the ones we are after, do not hit the recursion limit.
+    """
+    count = 0
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        count += 1
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return count
+
+
+class RenderTimer:
+    """
+    Times serializers and DRF renderers while a request is handled. `BaseSerializer.data` and
+    `Response.rendered_content` are patched while `use` runs, the same way
+    `drftest.cassette.Cassette` patches urlopen. Serializers nested in others (or accessed
+    from `SerializerMethodField`s) are counted as part of the outermost one.
+    """
+    def __init__(self):
+        self.serializer_ms = None
+        self.renderer_ms = None
+        self._depth = {}
+
+    def _timed(self, original, attribute):
+        timer = self
+
+        def get(obj):
+            if timer._depth.get(attribute):
+                return original.fget(obj)
+            timer._depth[attribute] = 1
+            start = time.perf_counter()
+            try:
+                return original.fget(obj)
+            finally:
+                timer._depth[attribute] = 0
+                setattr(timer, attribute, (getattr(timer, attribute) or 0) +
+                        (time.perf_counter() - start) * 1000)
+
+        return property(get)
+
+    @contextmanager
+    def use(self):
+        original_data = vars(BaseSerializer)['data']
+        original_rendered_content = vars(Response)['rendered_content']
+        BaseSerializer.data = self._timed(original_data, 'serializer_ms')
+        Response.rendered_content = self._timed(original_rendered_content, 'renderer_ms')
+        try:
+            yield self
+        finally:
+            BaseSerializer.data = original_data
+            Response.rendered_content = original_rendered_content
+
+
+def get_endpoint(response, method_name, url):
+    """
+    Names the endpoint which handled `response` by http method and url pattern, so that
+    requests to the same endpoint with different path parameters are grouped together.
+    """
+    match = getattr(response, 'resolver_match', None)
+    route = getattr(match, 'route', None)
+    return '{} {}'.format(method_name, '/' + route if route else url)
+
+
+def profile_response(response, response_data, method_name, url, meta, render_timer):
+    """
+    `render_timer` is the `RenderTimer` which was in use while the request was handled.
+    """
+    profiles.append({
+        'endpoint': get_endpoint(response, method_name, url),
+        'url': url,
+        'test': '{}.{}'.format(meta['class_name'], meta['method_name']),
+        'app_name': meta['app_name'],
+        'bytes': None if getattr(response, 'streaming', False) else len(response.content),
+        'objects': count_objects(response_data),
+        'serializer_ms': render_timer.serializer_ms,
+        'renderer_ms': render_timer.renderer_ms,
+    })
+
+
+def build_report(budget=None):
+    """
+    Aggregates `profiles` per endpoint. Endpoints are ranked by size of their largest response.
+    Sizes of streaming responses are unknown, so they are left out of `max_bytes` and
+    `mean_bytes`, which are None for endpoints that only stream.
+    """
+    endpoints = OrderedDict()
+    for profile in profiles:
+        summary = endpoints.setdefault(profile['endpoint'], {
+            'endpoint': profile['endpoint'],
+            'app_name': profile['app_name'],
+            'requests': 0,
+            'sized_requests': 0,
+            'total_bytes': 0,
+            'max_bytes': -1,
+            'max_objects': 0,
+            'max_serializer_ms': None,
+            'max_renderer_ms': None,
+            'heaviest_test': None,
+        })
+        summary['requests'] += 1
+        summary['max_objects'] = max(summary['max_objects'], profile['objects'])
+        if profile['bytes'] is not None:
+            summary['sized_requests'] += 1
+            summary['total_bytes'] += profile['bytes']
+            if profile['bytes'] > summary['max_bytes']:
+                summary['max_bytes'] = profile['bytes']
+                summary['heaviest_test'] = profile['test']
+        for key in ['serializer_ms', 'renderer_ms']:
+            if profile[key] is not None:
+                summary['max_' + key] = max(summary['max_' + key] or 0, profile[key])
+    ranked = sorted(endpoints.values(), key=lambda s: (-s['max_bytes'], s['endpoint']))
+    for summary in ranked:
+        sized_requests = summary.pop('sized_requests')
+        total_bytes = summary.pop('total_bytes')
+        if not sized_requests:
+            summary['max_bytes'] = None
+        summary['mean_bytes'] = total_bytes / sized_requests if sized_requests else None
+        summary['over_budget'] = budget is not None and sized_requests > 0 and \
+            summary['max_bytes'] > budget
+    return {'budget': budget, 'endpoints': ranked}
+
+
+def write_report(root_dir):
+    """
+    Writes the report as json to `root_dir`, logs endpoints which are over budget and returns
+    the report.
+    """
+    report = build_report(_get_budget())
+    with open(os.path.join(root_dir, REPORT_FILE_NAME), 'w+') as report_file:
+        json.dump(report, report_file, indent=4, sort_keys=True)
+    for summary in report['endpoints']:
+        if summary['over_budget']:
+            logging.warning('Response of {} is {} bytes which exceeds budget of {} bytes'.format(
+                summary['endpoint'], summary['max_bytes'], report['budget']))
+    return report
+
+
+def render_page(report, extension):
+    """
+    Renders the report as a docs page. `extension` is either 'md' or 'html'.
+    """
+    return loader.get_template('{}.{}'.format(PAGE_NAME, extension)).render(report)
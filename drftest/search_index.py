@@ -0,0 +1,120 @@
+import json
+import os
+from collections import OrderedDict
+
+"""
+Search index is written to `DIR_NAME` under docs directory. It consists of a manifest and one
+shard per app, so that a search only loads shards of apps which contain the searched tokens.
+
+manifest:
+{
+    'apps': ['{Name of app}', ...],
+    'tokens': {'{token}': [{Positions of apps in `apps` whose shard contains the token}]},
+}
+shard of an app (apps/{app_name}):
+{
+    'classes': ['{Name of test class}', ...],
+    'docs': [[{Position of class in `classes`}, '{test name}', '{method}', '{url}', {status}]],
+    'tokens': {'{token}': [{Positions of docs in `docs` which contain the token}]},
+}
+Tokens are lowercase url path segments, http method, response status, names of app, test class
+and test (and parts of names separated by `_`) and keys of json request and response data.
+Tokens of manifest and shards are sorted so that they can be searched by prefix.
+"""
+DIR_NAME = 'drftest_search'
+SCRIPT_CALLBACK = 'drftestSearch.load'
+
+
+def _json_keys(data):
+    keys = set()
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            keys.update(str(key) for key in item)
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return keys
+
+
+def get_tokens(entry):
+    meta = entry['meta']
+    tokens = {entry['method'], str(entry['response']['status'])}
+    tokens.update(segment for segment in entry['url'].split('?')[0].split('/') if segment)
+    for name in [meta['app_name'], meta['class_name'], meta['method_name']]:
+        tokens.add(name)
+        tokens.update(part for part in name.split('_') if part)
+    tokens.update(_json_keys(entry['data']))
+    tokens.update(_json_keys(entry['response']['data']))
+    return {token.lower() for token in tokens}
+
+
+def build_shard(app_docs):
+    """
+    Builds shard of an app out of its categorized docs.
+    """
+    classes = list(app_docs)
+    docs = []
+    tokens = {}
+    for class_position, class_name in enumerate(classes):
+        for entry in app_docs[class_name]['tests']:
+            doc_position = len(docs)
+            docs.append([class_position, entry['meta']['method_name'], entry['method'],
+                         entry['url'], entry['response']['status']])
+            for token in get_tokens(entry):
+                tokens.setdefault(token, []).append(doc_position)
+    return {
+        'classes': classes,
+        'docs': docs,
+        'tokens': OrderedDict(sorted(tokens.items())),
+    }
+
+
+def _dump(dir_path, name, payload, as_script):
+    """
+    Writes `payload` as compact json. If `as_script` is set, it is wrapped in a call to
+    `SCRIPT_CALLBACK` so that pages opened from disk can load it using a script tag, which
+    unlike fetching json is not blocked for `file://` urls.
+    """
+    content = json.dumps(payload, separators=(',', ':'))
+    if as_script:
+        content = '{}({}, {});\n'.format(SCRIPT_CALLBACK, json.dumps(name), content)
+    path = os.path.join(dir_path, '{}.{}'.format(name, 'js' if as_script else 'json'))
+    with open(path, 'w+') as index_file:
+        index_file.write(content)
+
+
+def write_shard(docs_path, app_name, app_docs, as_script=False):
+    """
+    Writes shard of an app and returns its tokens.
+    """
+    dir_path = os.path.join(docs_path, DIR_NAME)
+    os.makedirs(os.path.join(dir_path, 'apps'), exist_ok=True)
+    shard = build_shard(app_docs)
+    _dump(dir_path, 'apps/{}'.format(app_name), shard, as_script)
+    return list(shard['tokens'])
+
+
+def write_manifest(docs_path, tokens_by_app, as_script=False):
+    """
+    `tokens_by_app` maps names of apps to tokens of their shards.
+    """
+    apps = list(tokens_by_app)
+    tokens = {}
+    for app_position, app_name in enumerate(apps):
+        for token in tokens_by_app[app_name]:
+            tokens.setdefault(token, []).append(app_position)
+    os.makedirs(os.path.join(docs_path, DIR_NAME), exist_ok=True)
+    _dump(os.path.join(docs_path, DIR_NAME), 'manifest', {
+        'apps': apps,
+        'tokens': OrderedDict(sorted(tokens.items())),
+    }, as_script)
+
+
+def write_index(docs_path, categorized_store, as_script=False):
+    tokens_by_app = OrderedDict(
+        (app_name, write_shard(docs_path, app_name, app_docs, as_script))
+        for app_name, app_docs in categorized_store.items()
+    )
+    write_manifest(docs_path, tokens_by_app, as_script)
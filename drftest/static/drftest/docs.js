@@ -0,0 +1,209 @@
+(function () {
+    'use strict';
+
+    function text(tag, className, content) {
+        var element = document.createElement(tag);
+        element.className = className;
+        element.textContent = content;
+        return element;
+    }
+
+    function buildNode(key, value, open) {
+        var keyPrefix = key === null ? '' : JSON.stringify(key) + ': ';
+        if (value === null || typeof value !== 'object') {
+            var leaf = document.createElement('div');
+            leaf.className = 'drftest-leaf';
+            if (keyPrefix) {
+                leaf.appendChild(text('span', 'drftest-key', keyPrefix));
+            }
+            leaf.appendChild(document.createTextNode(JSON.stringify(value)));
+            return leaf;
+        }
+        var isArray = Array.isArray(value);
+        var keys = Object.keys(value);
+        var details = document.createElement('details');
+        details.open = open;
+        var summary = document.createElement('summary');
+        if (keyPrefix) {
+            summary.appendChild(text('span', 'drftest-key', keyPrefix));
+        }
+        summary.appendChild(document.createTextNode(
+            (isArray ? '[' : '{') + ' ' + keys.length + (isArray ? ' items ]' : ' keys }')));
+        details.appendChild(summary);
+        keys.forEach(function (childKey) {
+            details.appendChild(buildNode(isArray ? null : childKey, value[childKey], false));
+        });
+        return details;
+    }
+
+    function renderTrees(container) {
+        var blocks = container.querySelectorAll('pre.drftest-json');
+        Array.prototype.forEach.call(blocks, function (block) {
+            var value;
+            try {
+                value = JSON.parse(block.textContent);
+            } catch (e) {
+                return;
+            }
+            var tree = document.createElement('div');
+            tree.className = 'drftest-tree';
+            tree.appendChild(buildNode(null, value, true));
+            block.parentNode.replaceChild(tree, block);
+        });
+    }
+
+    // Trees are only built when a test is expanded, so large pages load as plain html.
+    // `toggle` does not bubble, hence the capturing listener.
+    document.addEventListener('toggle', function (event) {
+        var target = event.target;
+        if (target.classList && target.classList.contains('drftest-test') && target.open) {
+            renderTrees(target);
+        }
+    }, true);
+
+    // Search index is written by drftest.search_index. Its parts are loaded using script tags,
+    // each of which calls `drftestSearch.load`, so that search also works for pages opened
+    // from disk.
+    var search = window.drftestSearch = {
+        loaded: {},
+        pending: {},
+        load: function (name, data) {
+            var callbacks = search.pending[name] || [];
+            search.loaded[name] = data;
+            delete search.pending[name];
+            callbacks.forEach(function (callback) {
+                callback(data);
+            });
+        }
+    };
+
+    function loadPart(baseUrl, name, callback) {
+        if (search.loaded[name]) {
+            callback(search.loaded[name]);
+            return;
+        }
+        if (search.pending[name]) {
+            search.pending[name].push(callback);
+            return;
+        }
+        search.pending[name] = [callback];
+        var script = document.createElement('script');
+        script.src = baseUrl + name + '.js';
+        document.head.appendChild(script);
+    }
+
+    function sortedKeys(tokens) {
+        if (!tokens.sortedKeys) {
+            Object.defineProperty(tokens, 'sortedKeys', {value: Object.keys(tokens).sort()});
+        }
+        return tokens.sortedKeys;
+    }
+
+    // Returns positions listed for every token starting with `term`. Keys are sorted, so
+    // matching tokens are found with a binary search instead of scanning all of them.
+    function positionsOf(tokens, term) {
+        var keys = sortedKeys(tokens);
+        var low = 0;
+        var high = keys.length;
+        while (low < high) {
+            var middle = (low + high) >> 1;
+            if (keys[middle] < term) {
+                low = middle + 1;
+            } else {
+                high = middle;
+            }
+        }
+        var positions = {};
+        for (var i = low; i < keys.length && keys[i].lastIndexOf(term, 0) === 0; i++) {
+            tokens[keys[i]].forEach(function (position) {
+                positions[position] = true;
+            });
+        }
+        return positions;
+    }
+
+    function matchAll(tokens, terms) {
+        var matched = null;
+        terms.forEach(function (term) {
+            var positions = positionsOf(tokens, term);
+            if (matched === null) {
+                matched = positions;
+                return;
+            }
+            Object.keys(matched).forEach(function (position) {
+                if (!positions[position]) {
+                    delete matched[position];
+                }
+            });
+        });
+        return Object.keys(matched || {}).map(Number).sort(function (a, b) {
+            return a - b;
+        });
+    }
+
+    var MAX_RESULTS = 50;
+
+    function showResults(list, results) {
+        list.innerHTML = '';
+        results.slice(0, MAX_RESULTS).forEach(function (result) {
+            var item = document.createElement('li');
+            var link = document.createElement('a');
+            link.href = result.app + '.html#' + result.className;
+            link.textContent = result.app + ' / ' + result.className + ' / ' + result.test;
+            item.appendChild(link);
+            item.appendChild(text('code', '', result.method + ' ' + result.url + ' ' +
+                result.status));
+            list.appendChild(item);
+        });
+    }
+
+    function runSearch(input, list) {
+        var baseUrl = input.getAttribute('data-search-url');
+        var query = input.value;
+        var terms = query.toLowerCase().split(/[\s\/?]+/).filter(Boolean);
+        if (!terms.length) {
+            list.innerHTML = '';
+            return;
+        }
+        loadPart(baseUrl, 'manifest', function (manifest) {
+            var apps = matchAll(manifest.tokens, terms).map(function (position) {
+                return manifest.apps[position];
+            });
+            var results = [];
+            var remaining = apps.length;
+            if (!remaining) {
+                showResults(list, results);
+            }
+            apps.forEach(function (app) {
+                loadPart(baseUrl, 'apps/' + app, function (shard) {
+                    matchAll(shard.tokens, terms).forEach(function (position) {
+                        var doc = shard.docs[position];
+                        results.push({
+                            app: app,
+                            className: shard.classes[doc[0]],
+                            test: doc[1],
+                            method: doc[2],
+                            url: doc[3],
+                            status: doc[4]
+                        });
+                    });
+                    remaining -= 1;
+                    if (!remaining && input.value === query) {
+                        showResults(list, results);
+                    }
+                });
+            });
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        var input = document.querySelector('.drftest-search');
+        if (!input) {
+            return;
+        }
+        var list = document.querySelector('.drftest-search-results');
+        input.addEventListener('input', function () {
+            runSearch(input, list);
+        });
+    });
+})();
@@ -2,6 +2,7 @@ import traceback
 
 from django_nose.runner import NoseTestSuiteRunner
 
+from drftest import doc_writer, memory_tracker, phase_timer
 from drftest.doc_generator import write_docs
 
 
@@ -9,8 +10,12 @@ class TestRunner(NoseTestSuiteRunner):
     def run_tests(self, test_labels, extra_tests=None, **kwargs):
         result = None
         try:
+            doc_writer.start()
             result = super().run_tests(test_labels, extra_tests)
-            write_docs()
+            write_docs(doc_writer.finish())
+            memory_tracker.print_report()
+            memory_tracker.stop()
+            phase_timer.write_report()
         except Exception:
             traceback.print_exc()
         finally:
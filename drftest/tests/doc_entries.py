@@ -0,0 +1,25 @@
+def make_entry(app_name, class_name, method_name, url='/api', data=None, response_data=None,
+               status=200):
+    """
+    Builds a doc entry of a get request in the format `drftest.doc_generator.store` keeps.
+    """
+    return {
+        'method': 'get',
+        'data': data,
+        'url': url,
+        'url_kwargs': None,
+        'format': 'json',
+        'headers': {},
+        'success': True,
+        'meta': {
+            'docs': '',
+            'method_name': method_name,
+            'class_name': class_name,
+            'app_name': app_name,
+        },
+        'response': {
+            'data': response_data,
+            'content_type': 'application/json',
+            'status': status,
+        }
+    }
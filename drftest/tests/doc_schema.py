@@ -1,6 +1,6 @@
 import json
 
-from schema import And, Use, Schema
+from schema import And, Optional, Or, Use, Schema
 
 
 def is_json_serializable(data):
@@ -31,5 +31,10 @@ doc_schema = Schema({
         'data': And(Use(is_json_serializable)),
         'content_type': And(Use(str)),
         'status': And(Use(int)),
-    }
+    },
+    Optional('outbound'): Or(None, [{
+        'method': And(Use(str)),
+        'url': And(Use(str)),
+        'status': And(Use(int)),
+    }]),
 })
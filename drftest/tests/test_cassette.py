@@ -0,0 +1,147 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+import urllib3
+from django.test import override_settings
+from django.urls import path, reverse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+
+from drftest import BaseViewTest, doc_generator
+from drftest.cassette import CassetteError, get_cassette_path
+from drftest.tests.doc_schema import doc_schema
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        ServiceHandler.hits += 1
+        body = json.dumps({'path': self.path, 'hits': ServiceHandler.hits}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class OutboundView(ViewSet):
+    service_url = None
+
+    def handle_get(self, request: Request) -> Response:
+        service_response = requests.get(self.service_url + '/things/')
+        return Response(status=status.HTTP_200_OK, data=service_response.json())
+
+    def handle_post(self, request: Request) -> Response:
+        http = urllib3.PoolManager()
+        service_response = http.request('GET', self.service_url + '/others/')
+        return Response(status=status.HTTP_200_OK,
+                        data=json.loads(service_response.data.decode('utf-8')))
+
+
+urlpatterns = [
+    path(
+        'outbound/',
+        OutboundView.as_view({'get': 'handle_get', 'post': 'handle_post'}),
+        name='outbound',
+    ),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class OutboundViewTest(BaseViewTest):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), ServiceHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        OutboundView.service_url = 'http://127.0.0.1:{}'.format(cls.server.server_port)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        doc_generator.class_docs = {}
+        doc_generator.store = []
+        self.cassettes_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(DRF_TEST_CASSETTES_DIR=self.cassettes_dir)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.cassettes_dir)
+        super().tearDown()
+
+    def _make_url(self, kwargs=None):
+        return reverse('outbound')
+
+    def _get_view_class(self):
+        return OutboundView
+
+    def replay_from_disk(self):
+        self._cassette = None
+
+    def test_records_outbound_calls(self):
+        hits = ServiceHandler.hits
+        response = self._get_for_response()
+        self.assertEqual(response.data, {'path': '/things/', 'hits': hits + 1})
+        with open(get_cassette_path(self.id())) as f:
+            interactions = json.load(f)['interactions']
+        self.assertEqual(len(interactions), 1)
+        self.assertEqual(interactions[0]['request']['method'], 'GET')
+        self.assertEqual(interactions[0]['request']['url'],
+                         OutboundView.service_url + '/things/')
+        self.assertEqual(interactions[0]['response']['status'], 200)
+
+    def test_replays_outbound_calls(self):
+        recorded = self._get_for_response().data
+        hits = ServiceHandler.hits
+        self.replay_from_disk()
+        self.assertEqual(self._get_for_response().data, recorded)
+        self.assertEqual(ServiceHandler.hits, hits)
+
+    def test_replays_plain_urllib3_calls(self):
+        recorded = self._post_for_response().data
+        hits = ServiceHandler.hits
+        self.replay_from_disk()
+        self.assertEqual(self._post_for_response().data, recorded)
+        self.assertEqual(ServiceHandler.hits, hits)
+
+    def test_calls_which_are_not_recorded_fail(self):
+        self._get_for_response()
+        self.replay_from_disk()
+        self._get_for_response()
+        with self.assertRaises(CassetteError):
+            self._get_for_response()
+
+    def test_outbound_calls_appear_in_docs(self):
+        self._get_for_response()
+        doc = doc_generator.store[0]
+        self.assertEqual(len(doc['outbound']), 1)
+        self.assertEqual(doc['outbound'], [{
+            'method': 'GET',
+            'url': OutboundView.service_url + '/things/',
+            'status': 200,
+        }])
+        self.assertTrue(doc_schema.is_valid(doc.as_dict()))
+
+    def test_calls_are_not_intercepted_without_cassettes_dir(self):
+        self.settings_override.disable()
+        self._get_for_response()
+        self.settings_override.enable()
+        self.assertFalse(os.listdir(self.cassettes_dir))
+        self.assertIsNone(doc_generator.store[0]['outbound'])
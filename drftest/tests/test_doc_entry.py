@@ -0,0 +1,52 @@
+from django.test import SimpleTestCase
+
+from drftest.doc_entry import DocEntry, DocMeta, DocResponse
+from drftest.tests.doc_schema import doc_schema
+
+
+class DocEntryTest(SimpleTestCase):
+    def make_entry(self, method_name='test_sth'):
+        return DocEntry(
+            method='post',
+            data={'foo': 'bar'},
+            url='/api',
+            url_kwargs={'pk': 2},
+            format='json',
+            headers={'Authorization': 'Token abcde'},
+            success=True,
+            meta=DocMeta.get(
+                docs='Method docstring',
+                method_name=method_name,
+                class_name='SthTest',
+                app_name='some_app',
+            ),
+            response=DocResponse(
+                data={'foo': 'barium'},
+                content_type='application/json',
+                status=200,
+            ),
+        )
+
+    def test_has_no_instance_dict(self):
+        entry = self.make_entry()
+        for record in [entry, entry.meta, entry.response]:
+            self.assertFalse(hasattr(record, '__dict__'))
+
+    def test_can_be_read_like_a_dict(self):
+        entry = self.make_entry()
+        self.assertEqual(entry['method'], 'post')
+        self.assertEqual(entry['meta']['class_name'], 'SthTest')
+        self.assertEqual(entry['response']['status'], 200)
+        self.assertIn('url_kwargs', entry)
+        with self.assertRaises(KeyError):
+            entry['unknown']
+
+    def test_dict_view_matches_schema(self):
+        entry = self.make_entry().as_dict()
+        self.assertIsInstance(entry['meta'], dict)
+        self.assertIsInstance(entry['response'], dict)
+        self.assertTrue(doc_schema.is_valid(entry))
+
+    def test_meta_is_shared_between_requests_of_a_test(self):
+        self.assertIs(self.make_entry().meta, self.make_entry().meta)
+        self.assertIsNot(self.make_entry().meta, self.make_entry('test_other').meta)
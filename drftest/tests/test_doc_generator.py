@@ -1,9 +1,11 @@
 import os
 import shutil
+from unittest import mock
 
 from django.test import override_settings, TestCase
 
 from drftest import doc_generator
+from drftest.tests.doc_entries import make_entry
 
 
 @override_settings(DRF_TEST_DOCS_DIR='drftest/tests/test_docs')
@@ -76,3 +78,138 @@ class DocGeneratorTest(TestCase):
             self.assertStrListContainsSubstring(lines, '* **Response data:** ')
             self.assertStrListContainsSubstring(lines, '* **Response status code**: 200')
             self.assertStrListContainsSubstring(lines, '* **Request data:**')
+
+    def test_outbound_calls_in_app_page(self):
+        doc_generator.store[0]['outbound'] = [
+            {'method': 'GET', 'url': 'http://service.local:80/things/', 'status': 200},
+        ]
+        doc_generator.write_docs()
+        with open(self.to_absolute_path('test_docs', 'docs', 'some_app.md')) as f:
+            self.assertIn('`GET http://service.local:80/things/` &rarr; 200', f.read())
+
+    def test_add_entry_indexes_entries(self):
+        entry = make_entry('other_app', 'OtherTest', 'test_other')
+        doc_generator.add_entry(entry)
+        self.assertIs(doc_generator.store[-1], entry)
+        self.assertEqual(doc_generator.categorized['other_app']['OtherTest']['methods'],
+                         {'test_other': [entry]})
+        self.assertIn('some_app', doc_generator.categorized)
+
+    def test_categorized_store_is_sorted(self):
+        doc_generator.store = [
+            make_entry('b_app', 'BTest', 'test_b', url='/first'),
+            make_entry('a_app', 'BTest', 'test_b'),
+            make_entry('b_app', 'ATest', 'test_a'),
+            make_entry('b_app', 'BTest', 'test_a'),
+            make_entry('b_app', 'BTest', 'test_b', url='/second'),
+        ]
+        categorized = doc_generator._categorize_store()
+        self.assertEqual(list(categorized), ['a_app', 'b_app'])
+        self.assertEqual(list(categorized['b_app']), ['ATest', 'BTest'])
+        tests = categorized['b_app']['BTest']['tests']
+        self.assertEqual([(t['meta']['method_name'], t['url']) for t in tests],
+                         [('test_a', '/api'), ('test_b', '/first'), ('test_b', '/second')])
+
+    def test_app_page_does_not_depend_on_test_order(self):
+        doc_generator.store = [
+            make_entry('some_app', 'BTest', 'test_b'),
+            make_entry('some_app', 'ATest', 'test_a'),
+            make_entry('some_app', 'ATest', 'test_b'),
+        ]
+        doc_generator.write_docs()
+        md_path = self.to_absolute_path('test_docs', 'docs', 'some_app.md')
+        with open(md_path) as f:
+            first = f.read()
+        doc_generator.store = list(reversed(doc_generator.store))
+        doc_generator.write_docs()
+        with open(md_path) as f:
+            self.assertEqual(first, f.read())
+
+    def test_yml_nav(self):
+        doc_generator.write_docs()
+        with open(self.to_absolute_path('test_docs', 'mkdocs.yml')) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[2:], [
+            'nav:',
+            '- "Home": "index.md"',
+            '- "some_app": "some_app.md"',
+        ])
+
+    @override_settings(DRF_TEST_SPLIT_APP_DOCS=True)
+    def test_split_app_pages(self):
+        doc_generator.store.append(make_entry('some_app', 'OtherTest', 'test_other'))
+        doc_generator.store[-1]['success'] = False
+        doc_generator.write_docs()
+        self.assertFalse(os.path.exists(self.to_absolute_path('test_docs', 'docs', 'some_app.md')))
+        with open(self.to_absolute_path('test_docs', 'docs', 'some_app', 'SthTest.md')) as f:
+            lines = f.readlines()
+            self.assertStrListContainsSubstring(lines[:3], '# SthTest')
+            self.assertStrListContainsSubstring(lines, 'Class docstring')
+            self.assertStrListContainsSubstring(lines, '**test_sth**')
+            self.assertStrListContainsSubstring(lines, '* **URL:** `/api`')
+        with open(self.to_absolute_path('test_docs', 'docs', 'some_app', 'index.md')) as f:
+            index = f.read()
+            self.assertIn('| [OtherTest](OtherTest.md) | 1 | 1 | 1 |', index)
+            self.assertIn('| [SthTest](SthTest.md) | 1 | 1 | 0 |', index)
+        with open(self.to_absolute_path('test_docs', 'mkdocs.yml')) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[2:], [
+            'nav:',
+            '- "Home": "index.md"',
+            '- "some_app":',
+            '    - "Overview": "some_app/index.md"',
+            '    - "OtherTest": "some_app/OtherTest.md"',
+            '    - "SthTest": "some_app/SthTest.md"',
+        ])
+
+    @override_settings(DRF_TEST_DOCS_FORMAT='html')
+    def test_html_pages(self):
+        doc_generator.store.append(make_entry('other_app', 'OtherTest', 'test_other'))
+        doc_generator.store[0]['response']['data'] = {'foo': '<b>barium</b>'}
+        doc_generator.store[0]['response']['content_type'] = 'application/json'
+        doc_generator.write_docs()
+        docs_path = self.to_absolute_path('test_docs', 'docs')
+        self.assertFalse(os.path.exists(self.to_absolute_path('test_docs', 'mkdocs.yml')))
+        self.assertFalse(os.path.exists(os.path.join(docs_path, 'some_app.md')))
+        for asset in ['docs.css', 'docs.js']:
+            self.assertTrue(os.path.exists(os.path.join(docs_path, 'assets', asset)))
+        with open(os.path.join(docs_path, 'index.html')) as f:
+            index = f.read()
+            self.assertIn('<a href="some_app.html">some_app</a>', index)
+            self.assertIn('<a href="other_app.html">other_app</a>', index)
+        with open(os.path.join(docs_path, 'some_app.html')) as f:
+            page = f.read()
+        self.assertIn('<h1>some_app</h1>', page)
+        self.assertIn('<h2>SthTest</h2>', page)
+        self.assertIn('Class docstring', page)
+        self.assertIn('<strong>test_sth</strong>', page)
+        self.assertIn('<code>/api</code>', page)
+        self.assertIn('&quot;Authorization&quot;: &quot;Token abcde&quot;', page)
+        self.assertIn('&lt;b&gt;barium&lt;/b&gt;', page)
+        self.assertNotIn('OtherTest', page)
+        self.assertTrue(page.rstrip().endswith('</html>'))
+
+    @override_settings(DRF_TEST_DOCS_FORMAT='html', DRF_TEST_DOCS_WORKERS=2)
+    def test_html_pages_are_written_by_worker_processes(self):
+        doc_generator.store.append(make_entry('other_app', 'OtherTest', 'test_other'))
+        with mock.patch.object(doc_generator, 'ProcessPoolExecutor',
+                               wraps=doc_generator.ProcessPoolExecutor) as executor:
+            doc_generator.write_docs()
+        self.assertEqual(executor.call_args[1]['max_workers'], 2)
+        for app_name, class_name in [('some_app', 'SthTest'), ('other_app', 'OtherTest')]:
+            with open(self.to_absolute_path('test_docs', 'docs', app_name + '.html')) as f:
+                self.assertIn('<h2>{}</h2>'.format(class_name), f.read())
+
+    @override_settings(DRF_TEST_DOCS_FORMAT='html')
+    def test_html_pages_are_written_in_process_by_default(self):
+        doc_generator.store.append(make_entry('other_app', 'OtherTest', 'test_other'))
+        with mock.patch.object(doc_generator, '_write_html_app_page',
+                               wraps=doc_generator._write_html_app_page) as write_page, \
+                mock.patch.object(doc_generator, '_sort_app_docs',
+                                  wraps=doc_generator._sort_app_docs) as sort_app_docs, \
+                mock.patch.object(doc_generator, 'ProcessPoolExecutor') as executor:
+            doc_generator.write_docs()
+        self.assertFalse(executor.called)
+        self.assertEqual(sort_app_docs.call_count, 2)
+        self.assertEqual(sorted(c[0][0] for c in write_page.call_args_list),
+                         ['other_app', 'some_app'])
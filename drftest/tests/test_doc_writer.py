@@ -0,0 +1,134 @@
+import os
+import shutil
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import override_settings, SimpleTestCase
+from django.urls import path
+
+from drftest import doc_generator, doc_writer, response_profiler
+from drftest.tests.doc_entries import make_entry
+
+
+def hand_off_docs(request):
+    doc_writer.class_started('b_app')
+    return HttpResponse(','.join(doc_writer.finish()))
+
+
+urlpatterns = [
+    path('hand-off/', hand_off_docs),
+]
+
+
+@override_settings(DRF_TEST_DOCS_DIR='drftest/tests/test_docs', DRF_TEST_BACKGROUND_DOCS=True)
+class BackgroundDocWriterTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        doc_generator.store = []
+        doc_generator.class_docs = {}
+        response_profiler.profiles = []
+
+    def tearDown(self):
+        super().tearDown()
+        doc_writer.finish()
+        dirpath = self.to_absolute_path('test_docs')
+        if os.path.isdir(dirpath):
+            shutil.rmtree(dirpath)
+
+    def to_absolute_path(self, *paths):
+        return os.path.join(os.path.dirname(__file__), *paths)
+
+    def run_classes(self, *entries):
+        for entry in entries:
+            doc_writer.class_started(entry['meta']['app_name'])
+            doc_generator.add_entry(entry)
+
+    def test_app_is_written_when_next_app_starts(self):
+        doc_writer.start()
+        self.run_classes(
+            make_entry('a_app', 'ATest', 'test_a', '/a/'),
+            make_entry('a_app', 'BTest', 'test_b', '/b/'),
+            make_entry('b_app', 'CTest', 'test_c', '/c/'),
+        )
+        written = doc_writer.finish()
+        self.assertEqual(list(written), ['a_app'])
+        self.assertEqual(written['a_app'][:2], (2, ('a_app', 'a_app.md')))
+        self.assertTrue(os.path.exists(self.to_absolute_path('test_docs', 'docs', 'a_app.md')))
+        self.assertFalse(os.path.exists(self.to_absolute_path('test_docs', 'docs', 'b_app.md')))
+
+    def test_write_docs_only_writes_remaining_apps(self):
+        doc_writer.start()
+        self.run_classes(
+            make_entry('a_app', 'ATest', 'test_a', '/a/'),
+            make_entry('b_app', 'CTest', 'test_c', '/c/'),
+        )
+        written = doc_writer.finish()
+        with mock.patch.object(doc_generator, 'write_app', wraps=doc_generator.write_app) as w:
+            doc_generator.write_docs(written)
+        self.assertEqual([c[0][0] for c in w.call_args_list], ['b_app'])
+        for page in ['a_app.md', 'b_app.md', 'index.md']:
+            self.assertTrue(os.path.exists(self.to_absolute_path('test_docs', 'docs', page)))
+        with open(self.to_absolute_path('test_docs', 'mkdocs.yml')) as f:
+            nav = f.read().splitlines()[3:]
+        self.assertEqual(nav, [
+            '- "Home": "index.md"',
+            '- "a_app": "a_app.md"',
+            '- "b_app": "b_app.md"',
+        ])
+
+    def test_app_with_new_entries_is_written_again(self):
+        doc_writer.start()
+        self.run_classes(
+            make_entry('a_app', 'ATest', 'test_a', '/a/'),
+            make_entry('b_app', 'CTest', 'test_c', '/c/'),
+            make_entry('a_app', 'DTest', 'test_d', '/d/'),
+        )
+        doc_generator.write_docs(doc_writer.finish())
+        with open(self.to_absolute_path('test_docs', 'docs', 'a_app.md')) as f:
+            page = f.read()
+        self.assertIn('## ATest', page)
+        self.assertIn('## DTest', page)
+
+    def test_old_docs_are_kept_until_first_app_is_handed_off(self):
+        old_page = self.to_absolute_path('test_docs', 'docs', 'old_app.md')
+        os.makedirs(os.path.dirname(old_page))
+        open(old_page, 'w').close()
+        doc_writer.start()
+        self.run_classes(make_entry('a_app', 'ATest', 'test_a', '/a/'))
+        self.assertTrue(os.path.exists(old_page))
+        self.assertIsNone(doc_writer.finish())
+        self.assertTrue(os.path.exists(old_page))
+
+        doc_writer.start()
+        self.run_classes(
+            make_entry('a_app', 'ATest', 'test_a', '/a/'),
+            make_entry('b_app', 'CTest', 'test_c', '/c/'),
+        )
+        doc_writer.finish()
+        self.assertFalse(os.path.exists(old_page))
+
+    def test_templates_are_loaded_before_tests_run(self):
+        doc_writer.start()
+        with override_settings(TEMPLATES=[]):
+            self.run_classes(
+                make_entry('a_app', 'ATest', 'test_a', '/a/'),
+                make_entry('b_app', 'CTest', 'test_c', '/c/'),
+            )
+            written = doc_writer.finish()
+        self.assertEqual(list(written), ['a_app'])
+        with open(self.to_absolute_path('test_docs', 'docs', 'a_app.md')) as f:
+            self.assertIn('## ATest', f.read())
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_docs_are_not_reported_as_rendered_by_views(self):
+        doc_writer.start()
+        self.run_classes(make_entry('a_app', 'ATest', 'test_a', '/a/'))
+        response = self.client.get('/hand-off/')
+        self.assertEqual(response.content, b'a_app')
+        self.assertEqual(response.templates, [])
+
+    @override_settings(DRF_TEST_BACKGROUND_DOCS=False)
+    def test_not_started_unless_enabled(self):
+        doc_writer.start()
+        self.assertIsNone(doc_writer.writer)
+        self.assertIsNone(doc_writer.finish())
@@ -0,0 +1,157 @@
+import io
+import unittest
+
+from django.test import override_settings, SimpleTestCase, TestCase
+from django.urls import path, reverse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+
+from drftest import BaseViewTest, doc_generator, memory_tracker
+
+leaked = []
+
+
+class LeakyView(ViewSet):
+    def handle_post(self, request: Request) -> Response:
+        leaked.append(bytearray(100000))
+        return Response(status=status.HTTP_200_OK, data={'leaked': len(leaked)})
+
+
+class CleanView(ViewSet):
+    def handle_get(self, request: Request) -> Response:
+        return Response(status=status.HTTP_200_OK,
+                        data=[{'id': i, 'name': 'item {}'.format(i)} for i in range(2000)])
+
+
+urlpatterns = [
+    path('leaky/', LeakyView.as_view({'post': 'handle_post'}), name='leaky'),
+    path('clean/', CleanView.as_view({'get': 'handle_get'}), name='clean'),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class LeakyViewTest(BaseViewTest):
+    track_memory = True
+
+    def _make_url(self, kwargs=None):
+        return reverse('leaky')
+
+    def _get_view_class(self):
+        return LeakyView
+
+    def test_leaks(self):
+        self._post_for_response()
+        self._post_for_response()
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class CleanViewTest(BaseViewTest):
+    track_memory = True
+
+    def _make_url(self, kwargs=None):
+        return reverse('clean')
+
+    def _get_view_class(self):
+        return CleanView
+
+    def test_many(self):
+        docs_count = len(doc_generator.store)
+        response = self._get_for_response()
+        self.assertSuccess(response)
+        response = self._get_for_response()
+        self.assertEqual(len(response.data), 2000)
+        self.assertEqual(len(doc_generator.store), docs_count + 2)
+        self.assertEqual(doc_generator.store[-1]['response']['data'][1999],
+                         {'id': 1999, 'name': 'item 1999'})
+
+
+class TrackedSuiteTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        memory_tracker.records = []
+
+    def tearDown(self):
+        super().tearDown()
+        memory_tracker.records = []
+        del leaked[:]
+
+    def run_suite(self, test_class, times):
+        for _ in range(times):
+            result = unittest.TestResult()
+            unittest.defaultTestLoader.loadTestsFromTestCase(test_class).run(result)
+            self.assertTrue(result.wasSuccessful(), result.errors + result.failures)
+
+    def test_request_growth_is_recorded(self):
+        self.run_suite(LeakyViewTest, 1)
+        requests = [r for r in memory_tracker.records
+                    if r['kind'] == 'request' and r['name'] == 'post /leaky/']
+        self.assertEqual(len(requests), 2)
+        for item in requests:
+            self.assertGreaterEqual(item['size_diff'], 90000)
+            self.assertIn(__file__ + ':', item['top'][0]['location'])
+        self.assertEqual(memory_tracker.build_report('request')[0]['name'], 'post /leaky/')
+
+    def test_responses_of_clean_view_are_not_reported(self):
+        # Let first use allocations (caches, lazy imports, etc.) happen before measuring.
+        self.run_suite(CleanViewTest, 2)
+        memory_tracker.records = []
+        self.run_suite(CleanViewTest, 3)
+        requests = [r for r in memory_tracker.records if r['name'] == 'get /clean/']
+        self.assertEqual(len(requests), 6)
+        # Each response holds 2000 dicts which docs keep a copy of. What remains is django's test
+        # client registering a finalizer per request and objects reused by docs from free lists,
+        # which tracemalloc attributes to the code that first allocated them.
+        self.assertLess(sum(r['size_diff'] for r in requests), 6 * 1024)
+        for item in requests:
+            self.assertFalse(any(location['location'].startswith(__file__ + ':')
+                                 for location in item['top']))
+        tests = [r for r in memory_tracker.build_report('test')
+                 if r['name'] == 'CleanViewTest.test_many']
+        self.assertLess(sum(t['size_diff'] for t in tests), 3 * 16 * 1024)
+
+
+def make_record(kind, name, size_diff, location='views.py:1'):
+    return {
+        'kind': kind,
+        'name': name,
+        'size_diff': size_diff,
+        'top': [{'location': location, 'size_diff': size_diff}] if size_diff > 0 else [],
+    }
+
+
+class MemoryReportTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        memory_tracker.records = [
+            make_record('request', 'get /a/', 5000),
+            make_record('request', 'get /a/', 3000, location='views.py:2'),
+            make_record('request', 'get /b/', 20000),
+            make_record('request', 'get /c/', -100),
+            make_record('test', 'ATest.test_a', 2048),
+        ]
+
+    def tearDown(self):
+        super().tearDown()
+        memory_tracker.records = []
+
+    def test_offenders_are_ranked_by_growth(self):
+        offenders = memory_tracker.build_report('request')
+        self.assertEqual([o['name'] for o in offenders], ['get /b/', 'get /a/'])
+        self.assertEqual(offenders[1]['size_diff'], 8000)
+        self.assertEqual(offenders[1]['grew'], 2)
+        self.assertEqual(offenders[1]['locations'], [('views.py:1', 5000), ('views.py:2', 3000)])
+
+    def test_report_is_limited(self):
+        self.assertEqual(len(memory_tracker.build_report('request', limit=1)), 1)
+
+    def test_printed_report(self):
+        stream = io.StringIO()
+        memory_tracker.print_report(stream)
+        report = stream.getvalue()
+        self.assertIn('Memory growth by endpoints (top 2):', report)
+        self.assertIn('+19.5 KiB  get /b/  (grew in 1 of 1 runs)', report)
+        self.assertIn('Memory growth by tests (top 1):', report)
+        self.assertIn('+2.0 KiB  ATest.test_a', report)
+        self.assertNotIn('get /c/', report)
@@ -0,0 +1,169 @@
+import io
+import json
+import os
+import shutil
+import unittest
+from unittest import mock
+
+from django.test import override_settings, SimpleTestCase, TestCase
+from django.urls import path, reverse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+
+from drftest import BaseViewTest, doc_generator, phase_timer
+
+
+class PingView(ViewSet):
+    def handle_get(self, request: Request) -> Response:
+        return Response(status=status.HTTP_200_OK, data={'pong': True})
+
+
+urlpatterns = [
+    path('ping/', PingView.as_view({'get': 'handle_get'}), name='ping'),
+]
+
+REPORT_PATH = 'drftest/tests/test_docs/timing.json'
+
+
+@override_settings(ROOT_URLCONF=__name__, DRF_TEST_TIMING_REPORT=REPORT_PATH)
+class PingViewTest(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        doc_generator.class_docs = {}
+        doc_generator.store = []
+
+    def _make_url(self, kwargs=None):
+        return reverse('ping')
+
+    def _get_view_class(self):
+        return PingView
+
+    def test_phases_of_request(self):
+        self._get_for_response()
+        self.assertEqual(self._phase_timer.current, phase_timer.TEST)
+        self.assertEqual(list(self._phase_timer.phases), [
+            phase_timer.FIXTURES,
+            phase_timer.SETUP,
+            phase_timer.TEST,
+            phase_timer.AUTH,
+            phase_timer.REQUEST,
+            phase_timer.DOCS,
+        ])
+
+
+class TimedSuiteTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        phase_timer.records = []
+        phase_timer.class_records.clear()
+
+    def tearDown(self):
+        super().tearDown()
+        phase_timer.records = []
+        phase_timer.class_records.clear()
+        dirpath = os.path.join(os.path.dirname(__file__), 'test_docs')
+        if os.path.isdir(dirpath):
+            shutil.rmtree(dirpath)
+
+    def test_tests_and_classes_are_timed(self):
+        result = unittest.TestResult()
+        unittest.defaultTestLoader.loadTestsFromTestCase(PingViewTest).run(result)
+        self.assertTrue(result.wasSuccessful(), result.errors + result.failures)
+        self.assertEqual(len(phase_timer.records), 3)
+        item = [r for r in phase_timer.records
+                if r['test'] == 'PingViewTest.test_phases_of_request'][0]
+        self.assertEqual(item['app_name'], 'drftest')
+        self.assertEqual(set(item['phases']), set(phase_timer.TEST_PHASES))
+        self.assertAlmostEqual(item['total_ms'], sum(item['phases'].values()))
+        self.assertEqual(list(phase_timer.class_records), [('drftest', 'PingViewTest')])
+        self.assertEqual(list(phase_timer.class_records['drftest', 'PingViewTest']),
+                         phase_timer.CLASS_PHASES)
+
+        with override_settings(DRF_TEST_TIMING_REPORT=REPORT_PATH):
+            phase_timer.write_report(io.StringIO())
+        with open(REPORT_PATH) as report_file:
+            report = json.load(report_file)
+        self.assertEqual(report['suite']['tests'], 3)
+        self.assertEqual(len(report['slowest_tests']), 3)
+        self.assertEqual(report['slowest_classes'][0]['tests'], 3)
+
+    def test_steps_called_directly_are_timed(self):
+        # Before python 3.8, unittest calls `setUp` and `tearDown` without private hooks.
+        PingViewTest.setUpClass()
+        try:
+            test = PingViewTest('test_phases_of_request')
+            test._pre_setup()
+            test.setUp()
+            test.test_phases_of_request()
+            test.tearDown()
+            test._post_teardown()
+        finally:
+            PingViewTest.tearDownClass()
+        self.assertEqual(len(phase_timer.records), 1)
+        self.assertEqual(set(phase_timer.records[0]['phases']), set(phase_timer.TEST_PHASES))
+
+    def test_nothing_is_timed_unless_enabled(self):
+        with mock.patch.object(phase_timer, 'is_enabled', return_value=False):
+            result = unittest.TestResult()
+            unittest.TestSuite([PingViewTest('test_calling_endpoint')]).run(result)
+        self.assertTrue(result.wasSuccessful(), result.errors + result.failures)
+        self.assertEqual(phase_timer.records, [])
+        self.assertIsNone(phase_timer.write_report(io.StringIO()))
+
+
+def make_record(test, phases, class_name='ATest'):
+    return {
+        'test': '{}.{}'.format(class_name, test),
+        'class_name': class_name,
+        'app_name': 'app',
+        'total_ms': sum(phases.values()),
+        'phases': phases,
+    }
+
+
+class TimingReportTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        phase_timer.records = [
+            make_record('test_{}'.format(i), {'setup': 1.0, 'request': float(i)})
+            for i in range(1, 100)
+        ] + [make_record('test_slow', {'setup': 1.0, 'rollback': 500.0}, class_name='BTest')]
+        phase_timer.class_records[('app', 'BTest')] = {'class_setup': 20.0}
+
+    def tearDown(self):
+        super().tearDown()
+        phase_timer.records = []
+        phase_timer.class_records.clear()
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(phase_timer.percentile(values, 50), 50)
+        self.assertEqual(phase_timer.percentile(values, 99), 99)
+        self.assertEqual(phase_timer.percentile([3], 90), 3)
+        self.assertIsNone(phase_timer.percentile([], 90))
+
+    def test_report(self):
+        report = phase_timer.build_report()
+        self.assertEqual(report['suite']['tests'], 100)
+        self.assertEqual(report['suite']['p50_ms'], 51.0)
+        self.assertEqual(report['suite']['max_ms'], 501.0)
+        self.assertEqual(report['suite']['total_ms'], 99 + 4950 + 501 + 20)
+        self.assertEqual(list(report['phases']), ['setup', 'request', 'rollback'])
+        self.assertEqual(report['phases']['request']['p90_ms'], 89.0)
+        self.assertEqual(report['phases']['rollback']['p99_ms'], 0)
+        self.assertEqual(report['class_phases']['class_setup']['total_ms'], 20.0)
+        self.assertEqual([t['test'] for t in report['slowest_tests'][:2]],
+                         ['BTest.test_slow', 'ATest.test_99'])
+        self.assertEqual([(c['class_name'], c['tests'], c['total_ms'])
+                          for c in report['slowest_classes']],
+                         [('ATest', 99, 99 + 4950), ('BTest', 1, 521.0)])
+
+    def test_printed_report(self):
+        report = phase_timer.format_report(phase_timer.build_report(), limit=1)
+        self.assertIn('Timing of 100 tests: 5570.0 ms in total, p50 51.0 ms', report)
+        self.assertIn('Slowest tests (top 1):', report)
+        self.assertIn('501.0 ms  app.BTest.test_slow', report)
+        self.assertIn('rollback 500.0, setup 1.0', report)
+        self.assertIn('5049.0 ms  app.ATest  (99 tests)', report)
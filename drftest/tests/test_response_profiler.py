@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+
+from django.test import override_settings, SimpleTestCase
+
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+
+from drftest import response_profiler, doc_generator
+
+
+class ChildSerializer(serializers.Serializer):
+    name = serializers.CharField()
+
+
+class ParentSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    child = ChildSerializer()
+
+
+def make_profile(endpoint, size, test='SthTest.test_sth', renderer_ms=1.0, serializer_ms=2.0):
+    return {
+        'endpoint': endpoint,
+        'url': '/api',
+        'test': test,
+        'app_name': 'some_app',
+        'bytes': size,
+        'objects': 1 if size is None else size // 10,
+        'serializer_ms': serializer_ms,
+        'renderer_ms': renderer_ms,
+    }
+
+
+class ResponseProfilerTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        response_profiler.profiles = [
+            make_profile('get /small/', 10),
+            make_profile('get /big/', 500, test='BigTest.test_small'),
+            make_profile('get /big/', 2000, test='BigTest.test_big', renderer_ms=None),
+        ]
+        doc_generator.store = []
+        self.original_rendered_content = vars(Response)['rendered_content']
+
+    def tearDown(self):
+        super().tearDown()
+        response_profiler.profiles = []
+        dirpath = os.path.join(os.path.dirname(__file__), 'test_docs')
+        if os.path.isdir(dirpath):
+            shutil.rmtree(dirpath)
+
+    def test_count_objects(self):
+        self.assertEqual(response_profiler.count_objects(None), 1)
+        self.assertEqual(response_profiler.count_objects({'a': [1, 2], 'b': {'c': 3}}), 6)
+
+    def test_count_objects_of_deeply_nested_data(self):
+        data = []
+        for _ in range(5000):
+            data = [data]
+        self.assertEqual(response_profiler.count_objects(data), 5001)
+
+    def test_report_ranks_heaviest_endpoints_first(self):
+        report = response_profiler.build_report()
+        self.assertEqual([s['endpoint'] for s in report['endpoints']],
+                         ['get /big/', 'get /small/'])
+        big = report['endpoints'][0]
+        self.assertEqual(big['requests'], 2)
+        self.assertEqual(big['max_bytes'], 2000)
+        self.assertEqual(big['mean_bytes'], 1250)
+        self.assertEqual(big['max_renderer_ms'], 1.0)
+        self.assertEqual(big['max_serializer_ms'], 2.0)
+        self.assertEqual(big['heaviest_test'], 'BigTest.test_big')
+
+    def test_render_timer_times_outermost_serializer_and_restores_patches(self):
+        original_data = vars(BaseSerializer)['data']
+        with response_profiler.RenderTimer().use() as timer:
+            data = ParentSerializer({'name': 'a', 'child': {'name': 'b'}}).data
+        self.assertEqual(data, {'name': 'a', 'child': {'name': 'b'}})
+        self.assertIsNotNone(timer.serializer_ms)
+        self.assertIsNone(timer.renderer_ms)
+        self.assertIs(vars(BaseSerializer)['data'], original_data)
+        self.assertIs(vars(Response)['rendered_content'], self.original_rendered_content)
+
+    def test_streaming_responses_are_left_out_of_sizes(self):
+        response_profiler.profiles.append(make_profile('get /stream/', None, renderer_ms=None))
+        response_profiler.profiles.append(make_profile('get /big/', None, renderer_ms=None))
+        report = response_profiler.build_report(budget=100)
+        stream = report['endpoints'][-1]
+        self.assertEqual(stream['endpoint'], 'get /stream/')
+        self.assertIsNone(stream['max_bytes'])
+        self.assertIsNone(stream['mean_bytes'])
+        self.assertFalse(stream['over_budget'])
+        self.assertEqual(report['endpoints'][0]['requests'], 3)
+        self.assertEqual(report['endpoints'][0]['mean_bytes'], 1250)
+
+    def test_report_flags_endpoints_over_budget(self):
+        report = response_profiler.build_report(budget=100)
+        self.assertEqual([s['over_budget'] for s in report['endpoints']], [True, False])
+
+    @override_settings(DRF_TEST_DOCS_DIR='drftest/tests/test_docs',
+                       DRF_TEST_RESPONSE_SIZE_BUDGET=100)
+    def test_write_docs_writes_report(self):
+        with self.assertLogs(level='WARNING'):
+            doc_generator.write_docs()
+        root = os.path.join(os.path.dirname(__file__), 'test_docs')
+        with open(os.path.join(root, response_profiler.REPORT_FILE_NAME)) as f:
+            report = json.load(f)
+        self.assertEqual(report['budget'], 100)
+        self.assertEqual(report['endpoints'][0]['endpoint'], 'get /big/')
+        with open(os.path.join(root, 'docs', 'response_profile.md')) as f:
+            page = f.read()
+        self.assertIn('| &#10008; | `get /big/` | 2 | 2000 | 1250 |', page)
+
+    @override_settings(DRF_TEST_DOCS_DIR='drftest/tests/test_docs', DRF_TEST_DOCS_FORMAT='html')
+    def test_write_html_docs_writes_report_page(self):
+        doc_generator.write_docs()
+        docs_path = os.path.join(os.path.dirname(__file__), 'test_docs', 'docs')
+        with open(os.path.join(docs_path, 'response_profile.html')) as f:
+            page = f.read()
+        self.assertIn('<td><code>get /big/</code></td><td>2</td><td>2000</td>', page)
+        with open(os.path.join(docs_path, 'index.html')) as f:
+            self.assertIn('<a href="response_profile.html">', f.read())
@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+
+from django.test import override_settings, SimpleTestCase
+
+from drftest import doc_generator, search_index
+from drftest.tests.doc_entries import make_entry
+
+
+@override_settings(DRF_TEST_DOCS_DIR='drftest/tests/test_docs')
+class SearchIndexTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        doc_generator.store = [
+            make_entry('shop', 'OrderTest', 'test_list', '/api/orders/',
+                       response_data=[{'total_price': 1, 'Items': [{'sku': 'a'}]}]),
+            make_entry('shop', 'CartTest', 'test_add', '/api/cart/?page=2',
+                       data={'quantity': 2}, status=201),
+            make_entry('users', 'ProfileTest', 'test_get', '/api/users/5/'),
+        ]
+        doc_generator.class_docs = {}
+
+    def tearDown(self):
+        super().tearDown()
+        dirpath = self.to_absolute_path('test_docs')
+        if os.path.isdir(dirpath):
+            shutil.rmtree(dirpath)
+
+    def to_absolute_path(self, *paths):
+        return os.path.join(os.path.dirname(__file__), *paths)
+
+    def test_tokens(self):
+        self.assertEqual(search_index.get_tokens(doc_generator.store[0]), {
+            'get', '200', 'api', 'orders', 'shop', 'ordertest', 'test_list', 'test', 'list',
+            'total_price', 'items', 'sku',
+        })
+        self.assertIn('cart', search_index.get_tokens(doc_generator.store[1]))
+        self.assertNotIn('?page=2', search_index.get_tokens(doc_generator.store[1]))
+
+    def test_shard(self):
+        shard = search_index.build_shard(doc_generator._categorize_store()['shop'])
+        self.assertEqual(shard['classes'], ['CartTest', 'OrderTest'])
+        self.assertEqual(shard['docs'], [
+            [0, 'test_add', 'get', '/api/cart/?page=2', 201],
+            [1, 'test_list', 'get', '/api/orders/', 200],
+        ])
+        self.assertEqual(shard['tokens']['api'], [0, 1])
+        self.assertEqual(shard['tokens']['quantity'], [0])
+        self.assertEqual(list(shard['tokens']), sorted(shard['tokens']))
+
+    @override_settings(DRF_TEST_SEARCH_INDEX=True)
+    def test_json_index_for_markdown_docs(self):
+        doc_generator.write_docs()
+        index_path = self.to_absolute_path('test_docs', 'docs', search_index.DIR_NAME)
+        with open(os.path.join(index_path, 'manifest.json')) as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest['apps'], ['shop', 'users'])
+        self.assertEqual(manifest['tokens']['api'], [0, 1])
+        self.assertEqual(manifest['tokens']['orders'], [0])
+        with open(os.path.join(index_path, 'apps', 'users.json')) as f:
+            self.assertEqual(json.load(f)['tokens']['users'], [0])
+
+    def test_no_index_for_markdown_docs_by_default(self):
+        doc_generator.write_docs()
+        self.assertFalse(os.path.exists(
+            self.to_absolute_path('test_docs', 'docs', search_index.DIR_NAME)))
+
+    @override_settings(DRF_TEST_DOCS_FORMAT='html')
+    def test_script_index_for_html_docs(self):
+        doc_generator.write_docs()
+        index_path = self.to_absolute_path('test_docs', 'docs', search_index.DIR_NAME)
+        with open(os.path.join(index_path, 'apps', 'shop.js')) as f:
+            content = f.read()
+        prefix = 'drftestSearch.load("apps/shop", '
+        self.assertTrue(content.startswith(prefix))
+        shard = json.loads(content[len(prefix):].rstrip().rstrip(';')[:-1])
+        self.assertEqual(shard['classes'], ['CartTest', 'OrderTest'])
+        with open(self.to_absolute_path('test_docs', 'docs', 'index.html')) as f:
+            self.assertIn('data-search-url="drftest_search/"', f.read())
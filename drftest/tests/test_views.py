@@ -1,16 +1,18 @@
 import io
+from unittest import mock
 
 import xlsxwriter
 from django.contrib.auth.models import User
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.test import override_settings
 from django.urls import reverse, path
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
-from drftest import BaseViewTest, doc_generator
+from drftest import BaseViewTest, doc_generator, response_profiler
 from drftest.tests.doc_schema import doc_schema
 
 
@@ -46,6 +48,11 @@ class DummyExcelView(ViewSet):
             content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
 
 
+class DummyStreamingView(ViewSet):
+    def handle_get(self, request: Request) -> StreamingHttpResponse:
+        return StreamingHttpResponse(iter([b'a,b\n', b'c,d\n']), content_type='text/csv')
+
+
 urlpatterns = [
     path(
         'dummy-json/<int:pk>/',
@@ -62,7 +69,12 @@ urlpatterns = [
         'dummy-excel/',
         DummyExcelView.as_view({'get': 'handle_get'}),
         name='dummy-excel'
-    )
+    ),
+    path(
+        'dummy-streaming/',
+        DummyStreamingView.as_view({'get': 'handle_get'}),
+        name='dummy-streaming'
+    ),
 ]
 
 
@@ -92,8 +104,8 @@ class DummyJsonViewPostTest(BaseViewTest):
         response = self._post_for_response(user=self.user, data={'foo': 'bar'})
         self.assertSuccess(response)
         self.assertEqual(1, len(doc_generator.store))
-        self.assertTrue(
-            doc_schema.is_valid(doc_generator.store[0]), 'generated docs should match docs schema')
+        self.assertTrue(doc_schema.is_valid(doc_generator.store[0].as_dict()),
+                        'generated docs should match docs schema')
 
     def test_values_of_doc_dict(self):
         """
@@ -181,8 +193,8 @@ class DummyExcelViewTest(BaseViewTest):
         response = self._get_for_response(user=self.user)
         self.assertSuccess(response)
         self.assertEqual(1, len(doc_generator.store))
-        self.assertTrue(
-            doc_schema.is_valid(doc_generator.store[0]), 'generated docs should match docs schema')
+        self.assertTrue(doc_schema.is_valid(doc_generator.store[0].as_dict()),
+                        'generated docs should match docs schema')
 
     def test_values_of_doc_dict(self):
         """
@@ -213,3 +225,111 @@ class DummyExcelViewTest(BaseViewTest):
             doc_generator.class_docs.get('DummyExcelViewTest', '').strip(),
             'Class docstring'
         )
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class DummyJsonViewUrlCacheTest(BaseViewTest):
+    url_cache_size = 1
+
+    def setUp(self):
+        super().setUp()
+        self.made_urls = []
+        doc_generator.class_docs = {}
+        doc_generator.store = []
+
+    def _make_url(self, kwargs=None):
+        self.made_urls.append(kwargs)
+        return reverse('dummy-with-pk', kwargs=kwargs)
+
+    def _get_view_class(self):
+        return DummyJsonView
+
+    def _get_default_url_kwargs(self):
+        return {'pk': 1}
+
+    def test_url_is_made_once_per_request(self):
+        self._delete_for_response(url_kwargs={'pk': 3})
+        self.assertEqual(self.made_urls, [{'pk': 3}])
+        self.assertEqual(doc_generator.store[0]['url'], '/dummy-json/3/')
+
+    def test_cached_url_is_reused(self):
+        self._delete_for_response(url_kwargs={'pk': 4})
+        self._delete_for_response(url_kwargs={'pk': 4})
+        self.assertEqual(self.made_urls, [{'pk': 4}])
+        self.assertEqual(doc_generator.store[1]['url'], '/dummy-json/4/')
+
+    def test_least_recently_used_url_is_evicted(self):
+        self._delete_for_response(url_kwargs={'pk': 5})
+        self._delete_for_response(url_kwargs={'pk': 6})
+        self._delete_for_response(url_kwargs={'pk': 5})
+        self.assertEqual(self.made_urls, [{'pk': 5}, {'pk': 6}, {'pk': 5}])
+
+    def test_cache_is_cleared_when_urlconf_changes(self):
+        self._delete_for_response(url_kwargs={'pk': 7})
+        with override_settings(ROOT_URLCONF=__name__):
+            self._delete_for_response(url_kwargs={'pk': 7})
+        self.assertEqual(self.made_urls, [{'pk': 7}, {'pk': 7}])
+
+
+@override_settings(ROOT_URLCONF=__name__, DRF_TEST_PROFILE_RESPONSES=True)
+class DummyJsonViewProfileTest(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        doc_generator.class_docs = {}
+        doc_generator.store = []
+        response_profiler.profiles = []
+
+    def tearDown(self):
+        super().tearDown()
+        response_profiler.profiles = []
+
+    def _make_url(self, kwargs=None):
+        return reverse('dummy-with-pk', kwargs=kwargs)
+
+    def _get_view_class(self):
+        return DummyJsonView
+
+    def _get_default_url_kwargs(self):
+        return {'pk': 1}
+
+    def test_response_is_profiled(self):
+        with mock.patch.object(JSONRenderer, 'render', autospec=True,
+                               side_effect=JSONRenderer.render) as render:
+            response = self._delete_for_response(url_kwargs={'pk': 3})
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(len(response_profiler.profiles), 1)
+        profile = response_profiler.profiles[0]
+        self.assertEqual(profile['endpoint'], 'delete /dummy-json/<int:pk>/')
+        self.assertEqual(profile['url'], '/dummy-json/3/')
+        self.assertEqual(profile['test'],
+                         'DummyJsonViewProfileTest.test_response_is_profiled')
+        self.assertEqual(profile['bytes'], len(response.content))
+        self.assertEqual(profile['objects'], 2)
+        self.assertIsNone(profile['serializer_ms'])
+        self.assertIsNotNone(profile['renderer_ms'])
+
+
+@override_settings(ROOT_URLCONF=__name__, DRF_TEST_PROFILE_RESPONSES=True)
+class DummyStreamingViewProfileTest(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        doc_generator.class_docs = {}
+        doc_generator.store = []
+        response_profiler.profiles = []
+
+    def tearDown(self):
+        super().tearDown()
+        response_profiler.profiles = []
+
+    def _make_url(self, kwargs=None):
+        return reverse('dummy-streaming')
+
+    def _get_view_class(self):
+        return DummyStreamingView
+
+    def test_streaming_response_is_profiled_without_size(self):
+        response = self._get_for_response()
+        self.assertEqual(b''.join(response.streaming_content), b'a,b\nc,d\n')
+        self.assertEqual(len(response_profiler.profiles), 1)
+        self.assertIsNone(response_profiler.profiles[0]['bytes'])
+        self.assertIsNone(response_profiler.profiles[0]['renderer_ms'])